@@ -0,0 +1,170 @@
+"""Benchmark eBay refreshes against the local fake API.
+
+Run from the repository root, for example::
+
+    python -m benchmarks.bench_refresh --orders 5000 --latency 0.08
+
+Reports wall time, the longest event loop stall and peak Python memory of
+``get_ebay_data`` (cold, then incremental on the same client) and of a
+refresh of every group coordinator. The fake API shares the event loop, so
+stalls include its own response encoding.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+from collections.abc import Awaitable, Callable
+import statistics
+import tempfile
+import time
+import tracemalloc
+from typing import Any
+
+from aiohttp import ClientSession
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.eBay.api import (
+    ENDPOINTS,
+    ConfigEntryAuth,
+    EbayApiClient,
+    get_ebay_data,
+)
+from custom_components.eBay.coordinator import async_create_coordinators
+
+from .fake_ebay import FakeEbayConfig, FakeEbayServer, RedirectingSession
+
+ACCESS_TOKEN = "fake-access-token"
+STALL_PROBE_INTERVAL = 0.001
+
+
+class StaticTokenSession:
+    """OAuth session stand-in holding a token that never expires.
+
+    It has no eBay implementation, so no application quota is read.
+    """
+
+    implementation = None
+    token = {"access_token": ACCESS_TOKEN, "expires_at": float("inf")}
+
+
+async def _watch_loop(stalls: list[float]) -> None:
+    """Record how late the event loop wakes up from short sleeps."""
+    while True:
+        start = time.perf_counter()
+        await asyncio.sleep(STALL_PROBE_INTERVAL)
+        stalls.append(time.perf_counter() - start - STALL_PROBE_INTERVAL)
+
+
+async def _measure(
+    func: Callable[[], Awaitable[Any]], runs: int
+) -> tuple[list[float], float, int]:
+    """Return the wall times, longest loop stall and peak memory of ``runs`` calls."""
+    timings = []
+    stalls: list[float] = []
+    watcher = asyncio.create_task(_watch_loop(stalls))
+    tracemalloc.reset_peak()
+    for _ in range(runs):
+        start = time.perf_counter()
+        await func()
+        timings.append(time.perf_counter() - start)
+    watcher.cancel()
+    return timings, max(stalls, default=0.0), tracemalloc.get_traced_memory()[1]
+
+
+def _report(name: str, timings: list[float], stall: float, peak: int) -> None:
+    """Print one result row."""
+    print(
+        f"{name:<32} median {statistics.median(timings) * 1000:9.1f} ms"
+        f"  max {max(timings) * 1000:9.1f} ms  stall {stall * 1000:7.1f} ms"
+        f"  peak {peak / 1024:9.0f} KiB"
+    )
+
+
+async def run(args: argparse.Namespace) -> None:
+    """Run every benchmark scenario."""
+    config = FakeEbayConfig(
+        latency=args.latency,
+        orders=args.orders,
+        max_page_size=args.page_size,
+        listings=args.listings,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+    )
+    server = FakeEbayServer(config)
+    base_url = await server.start()
+    tracemalloc.start()
+
+    def new_client() -> EbayApiClient:
+        return EbayApiClient(
+            RedirectingSession(ClientSession(), base_url),
+            max_concurrency=args.max_concurrency,
+        )
+
+    async def cold() -> None:
+        client = new_client()
+        try:
+            await get_ebay_data(ACCESS_TOKEN, ENDPOINTS, client=client)
+        finally:
+            await client.session.close()
+
+    _report("get_ebay_data cold", *await _measure(cold, args.runs))
+
+    client = new_client()
+    await get_ebay_data(ACCESS_TOKEN, ENDPOINTS, client=client)
+    _report(
+        "get_ebay_data incremental",
+        *await _measure(
+            lambda: get_ebay_data(ACCESS_TOKEN, ENDPOINTS, client=client), args.runs
+        ),
+    )
+    await client.session.close()
+
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass = HomeAssistant(config_dir)
+        client = new_client()
+        auth = ConfigEntryAuth(hass, StaticTokenSession(), client)
+        auth.coordinators = async_create_coordinators(hass, auth)
+        # Coordinators only fetch the endpoints of keys read by an entity, so
+        # stand in for a sensor on every key
+        for coordinator in auth.coordinators.values():
+            for endpoint in coordinator.endpoints:
+                for key in endpoint.keys:
+                    coordinator.async_use_key(key)
+
+        async def refresh_all() -> None:
+            await asyncio.gather(
+                *(
+                    coordinator.async_refresh()
+                    for coordinator in auth.coordinators.values()
+                )
+            )
+
+        _report("coordinator refresh", *await _measure(refresh_all, args.runs))
+        await client.session.close()
+        await hass.async_stop(force=True)
+
+    tracemalloc.stop()
+    await server.stop()
+    calls = sum(server.calls.values())
+    print(f"fake API calls {calls}, {server.bytes_sent / 1024:.0f} KiB sent")
+    for path, count in server.calls.most_common():
+        print(f"  {count:6d}  {path}")
+
+
+def main() -> None:
+    """Parse arguments and run the benchmarks."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds")
+    parser.add_argument("--orders", type=int, default=500)
+    parser.add_argument("--page-size", type=int, default=200)
+    parser.add_argument("--listings", type=int, default=1000)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--max-concurrency", type=int, default=8)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,369 @@
+"""Local stand-in for the eBay REST endpoints used by the integration.
+
+Serves the Fulfillment, Post-Order, Inventory, Analytics, Developer Analytics
+and OAuth token endpoints from ``const.py`` with synthetic data, configurable
+latency, page sizes, order counts and injected errors.
+"""
+from __future__ import annotations
+
+import asyncio
+from collections import Counter
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+import json
+import random
+from typing import Any
+
+from aiohttp import ClientSession, web
+
+EBAY_API_BASE = "https://api.ebay.com"
+
+
+@dataclass
+class FakeEbayConfig:
+    """Shape of the data and behaviour of the fake eBay API."""
+
+    latency: float = 0.05
+    orders: int = 500
+    max_page_size: int = 200
+    default_page_size: int = 50
+    fulfilled: int = 1200
+    cancelled: int = 40
+    modified: int = 5
+    recent: int = 1500
+    returns: int = 3
+    cancellations: int = 2
+    listings: int = 1000
+    error_rate: float = 0.0
+    rate_limit_rate: float = 0.0
+    seed: int = 0
+
+
+def _iso(value: datetime) -> str:
+    """Format a datetime like eBay does."""
+    return value.strftime("%Y-%m-%dT%H:%M:%S.000Z")
+
+
+class FakeEbayServer:
+    """An aiohttp server answering like api.ebay.com."""
+
+    def __init__(self, config: FakeEbayConfig | None = None) -> None:
+        """Initialize the server and its routes."""
+        self.config = config or FakeEbayConfig()
+        self.calls: Counter[str] = Counter()
+        self.bytes_sent = 0
+        self.fulfillments: dict[str, list[str]] = {}
+        # Quantities overriding the synthetic ones, by SKU
+        self.stock: dict[str, int] = {}
+        self._random = random.Random(self.config.seed)
+        self._now = datetime.now(timezone.utc)
+        self._runner: web.AppRunner | None = None
+        self._traffic_body: bytes | None = None
+        self.base_url = ""
+        app = web.Application(middlewares=[self._middleware])
+        app.router.add_get("/sell/fulfillment/v1/order", self._orders)
+        app.router.add_get("/sell/fulfillment/v1/order/{order_id}", self._get_order)
+        app.router.add_get(
+            "/sell/fulfillment/v1/order/{order_id}/shipping_fulfillment",
+            self._fulfillments,
+        )
+        app.router.add_post(
+            "/sell/fulfillment/v1/order/{order_id}/shipping_fulfillment",
+            self._create_fulfillment,
+        )
+        app.router.add_get("/post-order/v2/return/search", self._returns)
+        app.router.add_get("/post-order/v2/cancellation/search", self._cancellations)
+        app.router.add_get("/sell/inventory/v1/inventory_item", self._inventory)
+        app.router.add_post(
+            "/sell/inventory/v1/bulk_get_inventory_item", self._bulk_inventory
+        )
+        app.router.add_get("/sell/analytics/v1/traffic_report", self._traffic)
+        app.router.add_get(
+            "/developer/analytics/v1_beta/rate_limit/", self._rate_limits
+        )
+        app.router.add_get(
+            "/developer/analytics/v1_beta/user_rate_limit/", self._rate_limits
+        )
+        app.router.add_post("/identity/v1/oauth2/token", self._token)
+        self.app = app
+
+    async def start(self) -> str:
+        """Start listening on a free local port and return the base url."""
+        self._runner = web.AppRunner(self.app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.base_url = f"http://127.0.0.1:{port}"
+        return self.base_url
+
+    async def stop(self) -> None:
+        """Stop the server."""
+        if self._runner is not None:
+            await self._runner.cleanup()
+
+    @web.middleware
+    async def _middleware(self, request: web.Request, handler) -> web.StreamResponse:
+        """Count calls, add latency and inject errors."""
+        self.calls[request.path] += 1
+        if self.config.latency:
+            await asyncio.sleep(self.config.latency)
+        if self._random.random() < self.config.rate_limit_rate:
+            return web.json_response({"errors": []}, status=429)
+        if self._random.random() < self.config.error_rate:
+            return web.json_response({"errors": []}, status=500)
+        response = await handler(request)
+        if isinstance(response, web.Response) and response.body is not None:
+            self.bytes_sent += len(response.body)
+        return response
+
+    def _page(self, request: web.Request, total: int) -> tuple[int, int, int]:
+        """Return the limit, offset and size of the requested page."""
+        limit = min(
+            int(request.query.get("limit", self.config.default_page_size)),
+            self.config.max_page_size,
+        )
+        offset = int(request.query.get("offset", 0))
+        return limit, offset, max(0, min(limit, total - offset))
+
+    def _order(self, index: int, status: str) -> dict[str, Any]:
+        """Build a deterministic synthetic order."""
+        created = self._now - timedelta(hours=index % 72)
+        ship_by = self._now + timedelta(hours=(index * 7) % 96 - 24)
+        amount = f"{(index % 50) * 1.5 + 4.99:.2f}"
+        return {
+            "orderId": f"{index:02d}-{index:05d}-{index:05d}",
+            "creationDate": _iso(created),
+            "lastModifiedDate": _iso(created),
+            "orderFulfillmentStatus": status,
+            "orderPaymentStatus": "PENDING" if index % 25 == 0 else "PAID",
+            "cancelStatus": {
+                "cancelState": "CANCELED" if index % 40 == 0 else "NONE_REQUESTED"
+            },
+            "buyer": {"username": f"buyer{index}"},
+            "pricingSummary": {
+                "priceSubtotal": {"value": amount, "currency": "USD"},
+                "total": {"value": amount, "currency": "USD"},
+            },
+            "lineItems": [
+                {
+                    "lineItemId": f"{index}{line}",
+                    "sku": f"SKU-{(index + line) % 300}",
+                    "title": f"Synthetic item {index}-{line}",
+                    "quantity": 1 + line,
+                    "lineItemCost": {"value": amount, "currency": "USD"},
+                    "lineItemFulfillmentInstructions": {
+                        "shipByDate": _iso(ship_by),
+                        "guaranteedDelivery": False,
+                    },
+                }
+                for line in range(1 + index % 3)
+            ],
+        }
+
+    async def _orders(self, request: web.Request) -> web.Response:
+        """Answer getOrders for the filters the integration uses."""
+        query = request.query.get("filter", "")
+        if "lastmodifieddate" in query:
+            total = self.config.modified
+            statuses = ("NOT_STARTED", "FULFILLED")
+        elif "creationdate" in query:
+            total = self.config.recent
+            statuses = ("FULFILLED", "NOT_STARTED", "IN_PROGRESS")
+        elif "FULFILLED" in query:
+            total, statuses = self.config.fulfilled, ("FULFILLED",)
+        elif "CANCELLED" in query:
+            total, statuses = self.config.cancelled, ("CANCELLED",)
+        else:
+            total, statuses = self.config.orders, ("NOT_STARTED", "IN_PROGRESS")
+        limit, offset, size = self._page(request, total)
+        body: dict[str, Any] = {
+            "href": str(request.url),
+            "total": total,
+            "limit": limit,
+            "offset": offset,
+            "orders": [
+                self._order(index, statuses[index % len(statuses)])
+                for index in range(offset, offset + size)
+            ],
+        }
+        if offset + size < total:
+            body["next"] = str(
+                request.url.update_query(limit=limit, offset=offset + limit)
+            )
+        return web.json_response(body)
+
+    async def _get_order(self, request: web.Request) -> web.Response:
+        """Answer getOrder, showing orders with a fulfillment as fulfilled."""
+        order_id = request.match_info["order_id"]
+        index = int(order_id.rpartition("-")[2])
+        status = "FULFILLED" if order_id in self.fulfillments else "NOT_STARTED"
+        return web.json_response(self._order(index, status))
+
+    async def _fulfillments(self, request: web.Request) -> web.Response:
+        """Answer getShippingFulfillments."""
+        order_id = request.match_info["order_id"]
+        return web.json_response(
+            {
+                "fulfillments": [
+                    {"fulfillmentId": tracking, "shipmentTrackingNumber": tracking}
+                    for tracking in self.fulfillments.get(order_id, [])
+                ]
+            }
+        )
+
+    async def _create_fulfillment(self, request: web.Request) -> web.Response:
+        """Answer createShippingFulfillment, recording the tracking number."""
+        order_id = request.match_info["order_id"]
+        tracking = (await request.json())["trackingNumber"]
+        self.fulfillments.setdefault(order_id, []).append(tracking)
+        return web.Response(
+            status=201, headers={"Location": f"{request.url}/{tracking}"}
+        )
+
+    async def _returns(self, request: web.Request) -> web.Response:
+        """Answer the Post-Order return search."""
+        return web.json_response({"total": self.config.returns, "members": []})
+
+    async def _cancellations(self, request: web.Request) -> web.Response:
+        """Answer the Post-Order cancellation search."""
+        return web.json_response(
+            {"total": self.config.cancellations, "cancellations": []}
+        )
+
+    async def _inventory(self, request: web.Request) -> web.Response:
+        """Answer getInventoryItems."""
+        limit, offset, size = self._page(request, self.config.listings)
+        return web.json_response(
+            {
+                "total": self.config.listings,
+                "size": size,
+                "limit": limit,
+                "inventoryItems": [
+                    self._inventory_item(f"SKU-{index}")
+                    for index in range(offset, offset + size)
+                ],
+            }
+        )
+
+    def _inventory_item(self, sku: str) -> dict[str, Any]:
+        """Build the inventory item of a SKU."""
+        quantity = self.stock.get(sku, int(sku.rpartition("-")[2]) % 7)
+        return {
+            "sku": sku,
+            "availability": {"shipToLocationAvailability": {"quantity": quantity}},
+        }
+
+    async def _bulk_inventory(self, request: web.Request) -> web.Response:
+        """Answer bulkGetInventoryItem."""
+        responses = []
+        for item in (await request.json())["requests"]:
+            sku = item["sku"]
+            if int(sku.rpartition("-")[2]) < self.config.listings:
+                responses.append(
+                    {
+                        "statusCode": 200,
+                        "sku": sku,
+                        "inventoryItem": self._inventory_item(sku),
+                    }
+                )
+            else:
+                responses.append({"statusCode": 404, "sku": sku})
+        return web.json_response({"responses": responses})
+
+    async def _traffic(self, request: web.Request) -> web.Response:
+        """Answer getTrafficReport with one record per listing."""
+        # The report never changes, so encode it once to keep the fake's own
+        # work out of the integration's event loop stall measurements
+        if self._traffic_body is None:
+            self._traffic_body = json.dumps(
+                {
+                    "records": [
+                        {
+                            "dimensionValues": [{"value": f"{110000000000 + index}"}],
+                            "metricValues": [
+                                {
+                                    "metricName": "LISTING_IMPRESSION",
+                                    "value": (index * 37) % 500,
+                                },
+                                {
+                                    "metricName": "LISTING_VIEWS",
+                                    "value": (index * 11) % 40,
+                                },
+                            ],
+                        }
+                        for index in range(self.config.listings)
+                    ]
+                }
+            ).encode()
+        return web.Response(body=self._traffic_body, content_type="application/json")
+
+    async def _rate_limits(self, request: web.Request) -> web.Response:
+        """Answer getRateLimits and getUserRateLimits."""
+        reset = _iso(self._now + timedelta(hours=12))
+        return web.json_response(
+            {
+                "rateLimits": [
+                    {
+                        "apiContext": "sell",
+                        "apiName": name,
+                        "apiVersion": "v1",
+                        "resources": [
+                            {
+                                "name": f"sell.{name.lower()}",
+                                "rates": [
+                                    {
+                                        "count": 0,
+                                        "limit": 100000,
+                                        "remaining": 100000,
+                                        "reset": reset,
+                                        "timeWindow": 86400,
+                                    }
+                                ],
+                            }
+                        ],
+                    }
+                    for name in ("Fulfillment", "Inventory", "Analytics")
+                ]
+            }
+        )
+
+    async def _token(self, request: web.Request) -> web.Response:
+        """Answer the OAuth token endpoint."""
+        return web.json_response(
+            {
+                "access_token": "fake-access-token",
+                "expires_in": 7200,
+                "refresh_token": "fake-refresh-token",
+                "refresh_token_expires_in": 47304000,
+                "token_type": "User Access Token",
+            }
+        )
+
+
+class RedirectingSession:
+    """Send requests meant for api.ebay.com to the fake server instead."""
+
+    def __init__(self, session: ClientSession, base_url: str) -> None:
+        """Wrap an aiohttp session."""
+        self._session = session
+        self._base_url = base_url
+
+    def _rewrite(self, url: str) -> str:
+        return str(url).replace(EBAY_API_BASE, self._base_url, 1)
+
+    def request(self, method: str, url: str, **kwargs: Any):
+        """Issue a request against the fake server."""
+        return self._session.request(method, self._rewrite(url), **kwargs)
+
+    def get(self, url: str, **kwargs: Any):
+        """Issue a GET against the fake server."""
+        return self._session.get(self._rewrite(url), **kwargs)
+
+    def post(self, url: str, **kwargs: Any):
+        """Issue a POST against the fake server."""
+        return self._session.post(self._rewrite(url), **kwargs)
+
+    async def close(self) -> None:
+        """Close the wrapped session."""
+        await self._session.close()
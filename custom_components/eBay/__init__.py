@@ -1,18 +1,47 @@
 """The ebay integration."""
 from __future__ import annotations
 
+from collections.abc import Callable, Coroutine
+from datetime import datetime
+from typing import Any
+
 import voluptuous as vol
 
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import CONF_CLIENT_ID, CONF_CLIENT_SECRET
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers import (
     config_entry_oauth2_flow,
     config_validation as cv,
+    entity_registry as er,
 )
+from homeassistant.helpers.event import async_call_later
 from homeassistant.helpers.typing import ConfigType
-from . import api, config_flow
-from .const import DOMAIN, OAUTH2_AUTHORIZE, OAUTH2_TOKEN
+
+from .api import ConfigEntryAuth, EbayApiClient, EbayImplementation
+from .cache import EbayResponseCache
+from .const import (
+    CONF_ENDPOINTS,
+    CONF_LOW_STOCK_SKUS,
+    CONF_LOW_STOCK_THRESHOLD,
+    CONF_USER_ID,
+    DEFAULT_ACCOUNT_NAME,
+    DEFAULT_LOW_STOCK_THRESHOLD,
+    DOMAIN,
+    EVENT_LOW_STOCK,
+    GROUP_LISTINGS,
+    OAUTH2_AUTHORIZE,
+    OAUTH2_TOKEN,
+)
+from .coordinator import (
+    EbayGroupCoordinator,
+    async_create_coordinators,
+    async_get_scheduler,
+)
+from .fulfillment import EbayFulfillmentQueue
+from .history import EbayHistory
+from .services import async_setup_services
+from .webhook import async_setup_webhook
 
 CONFIG_SCHEMA = vol.Schema(
     {
@@ -27,19 +56,21 @@ CONFIG_SCHEMA = vol.Schema(
     extra=vol.ALLOW_EXTRA,
 )
 
-PLATFORMS = ["sensor"]
+PLATFORMS = ["binary_sensor", "sensor"]
 
 
 async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
     """Set up the ebay component."""
     hass.data[DOMAIN] = {}
+    async_setup_services(hass)
 
     if DOMAIN not in config:
         return True
 
-    config_flow.OAuth2FlowHandler.async_register_implementation(
+    config_entry_oauth2_flow.async_register_implementation(
         hass,
-        api.EbayImplementation(
+        DOMAIN,
+        EbayImplementation(
             hass,
             DOMAIN,
             config[DOMAIN][CONF_CLIENT_ID],
@@ -54,7 +85,12 @@ async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
 
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
-    """Set up ebay from a config entry."""
+    """Set up ebay from a config entry.
+
+    Entities are added right away with their cached or restored values; groups
+    never fetched before refresh in the background instead of holding up the
+    setup.
+    """
     implementation = (
         await config_entry_oauth2_flow.async_get_config_entry_implementation(
             hass, entry
@@ -63,10 +99,76 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
 
     session = config_entry_oauth2_flow.OAuth2Session(hass, entry, implementation)
 
-    # If using a requests-based API lib
-    hass.data[DOMAIN][entry.entry_id] = api.ConfigEntryAuth(hass, session)
+    if entry.title == DOMAIN:
+        # Entries created before multi-account support were titled "ebay"
+        hass.config_entries.async_update_entry(entry, title=DEFAULT_ACCOUNT_NAME)
+    await _async_migrate_unique_ids(hass, entry)
+    if CONF_USER_ID not in entry.data:
+        # Entries added before accounts were identified by their eBay user id
+        # get it, and their unique id, when they sign in again
+        entry.async_start_reauth(hass)
 
-    await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+    scheduler = async_get_scheduler(hass)
+    cache = EbayResponseCache(hass, entry.entry_id)
+    await cache.async_load()
+    client = scheduler.async_create_client(entry.entry_id, cache)
+    try:
+        client.inventory.set_thresholds(
+            entry.options.get(CONF_LOW_STOCK_THRESHOLD, DEFAULT_LOW_STOCK_THRESHOLD),
+            dict(entry.options.get(CONF_LOW_STOCK_SKUS, {})),
+        )
+        auth = ConfigEntryAuth(hass, session, client)
+        entry.async_on_unload(auth.token_manager.async_start())
+        auth.coordinators = async_create_coordinators(
+            hass, auth, entry.options.get(CONF_ENDPOINTS)
+        )
+        history = EbayHistory(hass, entry)
+        await history.async_load()
+        for coordinator in auth.coordinators.values():
+            entry.async_on_unload(
+                coordinator.async_add_listener(_history_listener(history, coordinator))
+            )
+        entry.async_on_unload(
+            auth.coordinators[GROUP_LISTINGS].async_add_listener(
+                _low_stock_listener(hass, entry, client)
+            )
+        )
+
+        # Groups with cached results start from the cache
+        for coordinator in auth.coordinators.values():
+            if (cached := coordinator.cached_data()) is not None:
+                coordinator.async_set_updated_data(cached)
+        hass.data[DOMAIN][entry.entry_id] = auth
+        auth.webhook = await async_setup_webhook(hass, entry, auth)
+        entry.async_on_unload(auth.webhook.async_unregister)
+        auth.fulfillment = EbayFulfillmentQueue(hass, entry, auth)
+        entry.async_create_background_task(
+            hass, auth.fulfillment.async_run(), f"ebay {entry.title} fulfillment"
+        )
+
+        await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+    except Exception:
+        # async_unload_entry isn't called for a failed setup, so give back
+        # the scheduler slot, and the shared session if it was the last one
+        hass.data[DOMAIN].pop(entry.entry_id, None)
+        await scheduler.async_release(entry.entry_id)
+        raise
+
+    # Refreshes start once the entities are added, since the endpoints each
+    # group fetches follow the entities reading them. Groups with cached
+    # results for every endpoint they fetch refresh at this account's
+    # staggered offset, the others now.
+    for coordinator in auth.coordinators.values():
+        if coordinator.data is not None and coordinator.has_planned_data():
+            delay = scheduler.stagger(entry.entry_id, coordinator.min_interval)
+        else:
+            delay = 0
+        entry.async_on_unload(
+            async_call_later(hass, delay, _refresh_job(hass, entry, coordinator))
+        )
+    entry.async_on_unload(
+        entry.add_update_listener(_options_listener(dict(entry.options)))
+    )
 
     return True
 
@@ -76,5 +178,83 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
     if unload_ok:
         hass.data[DOMAIN].pop(entry.entry_id)
+        await async_get_scheduler(hass).async_release(entry.entry_id)
 
     return unload_ok
+
+
+def _options_listener(
+    options: dict[str, Any]
+) -> Callable[[HomeAssistant, ConfigEntry], Coroutine[Any, Any, None]]:
+    """Return an update listener reloading the entry when its options change.
+
+    Token refreshes rewrite the entry data several times an hour; those
+    updates leave the options alone and don't reload anything.
+    """
+
+    async def _async_reload(hass: HomeAssistant, entry: ConfigEntry) -> None:
+        if entry.options != options:
+            await hass.config_entries.async_reload(entry.entry_id)
+
+    return _async_reload
+
+
+def _history_listener(
+    history: EbayHistory, coordinator: EbayGroupCoordinator
+) -> Callable[[], None]:
+    """Return a coordinator listener sampling successful refreshes."""
+
+    @callback
+    def _record() -> None:
+        if coordinator.last_update_success and coordinator.data:
+            history.record(coordinator.data)
+
+    return _record
+
+
+def _low_stock_listener(
+    hass: HomeAssistant, entry: ConfigEntry, client: EbayApiClient
+) -> Callable[[], None]:
+    """Return a coordinator listener firing an event per threshold crossing."""
+
+    @callback
+    def _fire() -> None:
+        for crossing in client.inventory.pop_crossings():
+            hass.bus.async_fire(
+                EVENT_LOW_STOCK, {"config_entry_id": entry.entry_id, **crossing}
+            )
+
+    return _fire
+
+
+def _refresh_job(
+    hass: HomeAssistant, entry: ConfigEntry, coordinator: EbayGroupCoordinator
+) -> Callable[[datetime], None]:
+    """Return a timer callback refreshing a coordinator in the background."""
+
+    @callback
+    def _refresh(_now: datetime) -> None:
+        entry.async_create_background_task(
+            hass, coordinator.async_refresh(), f"{coordinator.name} refresh"
+        )
+
+    return _refresh
+
+
+async def _async_migrate_unique_ids(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Prefix entity unique ids with the entry id so accounts don't collide."""
+    prefix = f"{entry.entry_id}_"
+
+    @callback
+    def _migrate(entity_entry: er.RegistryEntry) -> dict[str, Any] | None:
+        if entity_entry.unique_id.startswith(prefix):
+            return None
+        return {"new_unique_id": prefix + entity_entry.unique_id}
+
+    await er.async_migrate_entries(hass, entry.entry_id, _migrate)
+
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Delete the response cache and history of a removed config entry."""
+    await EbayResponseCache(hass, entry.entry_id).async_remove()
+    await EbayHistory(hass, entry).async_remove()
@@ -1,197 +1,1094 @@
 """API for ebay bound to Home Assistant OAuth."""
-from typing import Any, cast
-from aiohttp import ClientSession
+from __future__ import annotations
+
+import asyncio
+from collections import Counter, deque
+from collections.abc import AsyncIterator, Awaitable, Callable, Iterable
+from contextlib import aclosing
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+import logging
+import random
+import re
+import time
+from typing import TYPE_CHECKING, Any, cast
+from aiohttp import ClientError, ClientResponseError, ClientSession, TCPConnector
 import base64
 from yarl import URL
 
-from homeassistant.core import HomeAssistant
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.exceptions import ConfigEntryAuthFailed
 from homeassistant.helpers import config_entry_oauth2_flow
 from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.helpers.event import async_call_later
 import homeassistant.util.dt as dt
 from .const import (
+    APPLICATION_SCOPE,
+    CACHE_TTLS,
+    COUNT_PAGE_LIMIT,
+    CREATED_ORDERS_URL,
+    DEFAULT_ENDPOINT_TIMEOUT,
+    DEFAULT_MAX_CONCURRENCY,
+    GROUP_LISTINGS,
+    GROUP_ORDERS,
+    GROUP_REQUESTS,
+    GROUP_TRAFFIC,
+    HTTP_DNS_CACHE_TTL,
+    HTTP_KEEPALIVE_TIMEOUT,
+    HTTP_LIMIT_PER_HOST,
+    IDENTITY_USER_URL,
+    LEGACY_SCOPES,
+    NEXT_ORDERS_DUE_COUNT,
+    ORDERS_DUE_SOON_WINDOW,
+    ORDERS_PAGE_LIMIT,
+    ORDERS_PAGE_WINDOW,
+    QUOTA_RESERVE_FRACTION,
+    RATE_LIMIT_BACKOFF_BASE,
+    RATE_LIMIT_BACKOFF_MAX,
+    RATE_LIMIT_MAX_RETRIES,
+    RATE_LIMIT_REFRESH_INTERVAL,
+    RATE_LIMIT_URL,
+    REQUEST_BURST,
+    REQUEST_RATE,
+    SALES_WINDOWS,
     SCOPES,
+    TOKEN_EXPIRY_GRACE,
+    TOKEN_REFRESH_BACKOFF,
+    TOKEN_REFRESH_MARGIN,
+    TOKEN_REFRESH_MIN_DELAY,
+    TOKEN_REFRESH_RETRIES,
+    TRAFFIC_MIN_IMPRESSIONS,
+    TRAFFIC_REPORT_TIMEOUT,
     UNFULFILLED_ORDERS_URL,
+    USER_RATE_LIMIT_URL,
     FULFILLED_ORDERS_URL,
     CANCELLED_ORDERS_URL,
     RETURN_REQUESTS_URL,
     CANCELLATION_REQUESTS_URL,
     ACTIVE_LISTINGS_URL,
+    INVENTORY_URL,
     TRAFFIC_REPORT_URL,
 )
+from .cache import EbayCacheEntry, EbayResponseCache
+from .decoder import async_json_loads
+from .health import EbayCircuitBreaker
+from .inventory import EbayInventoryIndex, inventory_values
+from .metrics import EbayMetrics, current_endpoint
+from .models import EbayOrder
+from .orders import EbayOrderDeltas, EbayOrderSync
+from .sales import EbaySalesLedger, SalesTotals
+from .traffic import ListingTrafficStore
 
+if TYPE_CHECKING:
+    from .coordinator import EbayGroupCoordinator
+    from .fulfillment import EbayFulfillmentQueue
+    from .webhook import EbayWebhook
 
-async def get_ebay_data(access_token):
+_LOGGER = logging.getLogger(__name__)
 
-    today = 0
-    total = 0
-    awaiting_payment = 0
-    fulfilled_total = 0
-    cancelled_total = 0
-    return_requests = 0
-    cancellation_requests = 0
-    active_listings = 0
-    listing_impressions = 0
-    listing_page_views = 0
-    click_through_rate = 0
 
-    async with ClientSession() as session:
+class EbayFetchError(Exception):
+    """Raised when none of the requested eBay endpoints could be fetched."""
 
-        order_response = await session.get(
-            UNFULFILLED_ORDERS_URL,
-            headers={"Authorization": "Bearer " + access_token},
-        )
-        if order_response.status == 200:
-            data = await order_response.json()
-            for order in data["orders"]:
-                if order.get("orderPaymentStatus") != "PAID":
-                    awaiting_payment += 1
-                for lineItem in order["lineItems"]:
-                    ship_by_date = dt.parse_datetime(
-                        lineItem["lineItemFulfillmentInstructions"]["shipByDate"]
-                    )
-                    # ship_by_date = ship_by_date.day - 1
-                    # This may be needed/easier depending on how ebay saves shipByDate based on timezone.
-                    # e.i. If it's saved 11:59pm central always it would show 1:59am next morning for someone in pacific.
-                    # ["lineItemFulfillmentInstructions"]["sourceTimeZone"] might start being returned and we can use that. however currently it's not.
-                    ship_by_date = dt.as_local(ship_by_date).day
-                    date_now = dt.now().day
-                    if ship_by_date == date_now:
-                        today = today + 1
-                        break
-            total = data["total"]
-
-        fulfilled_response = await session.get(
-            FULFILLED_ORDERS_URL,
-            headers={"Authorization": "Bearer " + access_token},
-        )
-        if fulfilled_response.status == 200:
-            data = await fulfilled_response.json()
-            fulfilled_total = data.get("total", 0)
 
-        cancelled_response = await session.get(
-            CANCELLED_ORDERS_URL,
-            headers={"Authorization": "Bearer " + access_token},
-        )
-        if cancelled_response.status == 200:
-            data = await cancelled_response.json()
-            cancelled_total = data.get("total", 0)
+class EbayRequestDeferred(Exception):
+    """Raised when the rate-limit governor postpones an endpoint refresh."""
 
-        return_response = await session.get(
-            RETURN_REQUESTS_URL,
-            headers={"Authorization": "Bearer " + access_token},
-        )
-        if return_response.status == 200:
-            data = await return_response.json()
-            return_requests = data.get("total", 0)
 
-        cancellation_req_response = await session.get(
-            CANCELLATION_REQUESTS_URL,
-            headers={"Authorization": "Bearer " + access_token},
-        )
-        if cancellation_req_response.status == 200:
-            data = await cancellation_req_response.json()
-            cancellation_requests = data.get("total", 0)
+class EbayCircuitOpen(Exception):
+    """Raised when an endpoint is skipped because it keeps failing."""
 
-        listings_response = await session.get(
-            ACTIVE_LISTINGS_URL,
-            headers={"Authorization": "Bearer " + access_token},
-        )
-        if listings_response.status == 200:
-            data = await listings_response.json()
-            active_listings = data.get("total", 0)
 
-        traffic_response = await session.get(
-            TRAFFIC_REPORT_URL,
-            headers={"Authorization": "Bearer " + access_token},
-        )
-        if traffic_response.status == 200:
-            data = await traffic_response.json()
-            for record in data.get("records", []):
-                metrics = {
-                    m.get("metricName"): float(m.get("value", 0))
-                    for m in record.get("metricValues", [])
+@dataclass(frozen=True)
+class EbayEndpoint:
+    """An independent eBay request that feeds one or more sensor keys."""
+
+    name: str
+    url: str
+    group: str
+    keys: tuple[str, ...]
+    parse: Callable[[Any], dict[str, Any]] | None = None
+    # Custom coroutine for endpoints that need more than a single GET
+    fetch: Callable[
+        [EbayApiClient, EbayEndpoint, str], Awaitable[dict[str, Any]]
+    ] | None = None
+    timeout: float = DEFAULT_ENDPOINT_TIMEOUT
+    # Low priority endpoints are deferred first when the call quota runs low
+    low_priority: bool = False
+
+
+def api_name(url: str) -> str:
+    """Return the eBay API a url belongs to, e.g. ``fulfillment``."""
+    parts = URL(url).path.strip("/").split("/")
+    if parts[0] in ("sell", "commerce") and len(parts) > 1:
+        return parts[1].replace("-", "")
+    return parts[0].replace("-", "")
+
+
+def granted_scopes(token: dict[str, Any]) -> tuple[str, ...]:
+    """Return the scopes an OAuth token was granted at authorization.
+
+    Tokens stored before the scopes were recorded hold ``LEGACY_SCOPES``.
+    """
+    if (scope := token.get("scope")) is None:
+        return LEGACY_SCOPES
+    return tuple(scope.split())
+
+
+def _with_page(url: str, limit: int, offset: int) -> str:
+    """Append limit and offset paging parameters to a url."""
+    separator = "&" if "?" in url else "?"
+    return f"{url}{separator}limit={limit}&offset={offset}"
+
+
+async def _async_fetch_unfulfilled_orders(
+    client: EbayApiClient, endpoint: EbayEndpoint, access_token: str
+) -> dict[str, Any]:
+    """Sync unfulfilled orders and count them by ship-by date and payment."""
+    await client.order_sync.async_sync(client, access_token, endpoint.timeout)
+    return unfulfilled_order_values(client.order_sync)
+
+
+async def _async_fetch_sales(
+    client: EbayApiClient, endpoint: EbayEndpoint, access_token: str
+) -> dict[str, Any]:
+    """Sync recently created orders and total them over the sales windows."""
+    await client.sales.async_sync(client, access_token, endpoint.timeout)
+    return sales_values(client.sales)
+
+
+def unfulfilled_order_values(order_sync: EbayOrderSync) -> dict[str, Any]:
+    """Return the unfulfilled order sensor values of the synced orders."""
+    ship_by = order_sync.ship_by
+    now = dt.now()
+    today = now.date()
+    awaiting_payment = sum(
+        order.payment_status != "PAID" for order in order_sync.orders.values()
+    )
+    return {
+        "ebay_orders_due_today": ship_by.due_on(today),
+        "ebay_orders_due_tomorrow": ship_by.due_on(today + timedelta(days=1)),
+        "ebay_orders_overdue": ship_by.overdue(now),
+        "ebay_orders_due_soon": ship_by.due_within(now, ORDERS_DUE_SOON_WINDOW),
+        "ebay_orders_due_today_attributes": {
+            "next_orders_due": [
+                {
+                    "order_id": order_id,
+                    "ship_by": dt.utc_from_timestamp(timestamp).isoformat(),
                 }
-                listing_impressions += int(metrics.get("LISTING_IMPRESSION", 0))
-                listing_page_views += int(
-                    metrics.get("LISTING_PAGE_VIEWS", metrics.get("LISTING_VIEWS", 0))
-                )
-            if listing_impressions:
-                click_through_rate = round(
-                    (listing_page_views / listing_impressions) * 100, 2
+                for timestamp, order_id in ship_by.most_urgent(NEXT_ORDERS_DUE_COUNT)
+            ]
+        },
+        "ebay_total_unfulfilled_orders": len(order_sync.orders),
+        "ebay_orders_awaiting_payment": awaiting_payment,
+    }
+
+
+def sales_values(sales: EbaySalesLedger) -> dict[str, Any]:
+    """Return the sales sensor values of every rolling window.
+
+    Revenue and average order value are reported in the currency with the
+    most revenue over the longest window; every currency is listed in the
+    revenue attributes. Units and order counts cover all currencies.
+    """
+    today = dt.now().date()
+    windows = {days: sales.totals(days, today) for days in SALES_WINDOWS}
+    longest = windows[max(SALES_WINDOWS)]
+    currency = max(longest, key=lambda code: longest[code].revenue, default=None)
+    values: dict[str, Any] = {"ebay_sales_currency": currency}
+    for days, totals in windows.items():
+        primary = totals.get(currency or "", SalesTotals())
+        values[f"ebay_revenue_{days}d"] = (
+            round(primary.revenue, 2) if currency is not None else None
+        )
+        values[f"ebay_average_order_value_{days}d"] = primary.average_order_value
+        values[f"ebay_units_sold_{days}d"] = sum(t.units for t in totals.values())
+        values[f"ebay_orders_{days}d"] = sum(t.orders for t in totals.values())
+        values[f"ebay_sales_{days}d_attributes"] = {
+            "currencies": {code: t.as_dict() for code, t in totals.items()}
+        }
+    return values
+
+
+def merge_orders(client: EbayApiClient, orders: Iterable[EbayOrder]) -> dict[str, Any]:
+    """Merge orders read outside a refresh and return the values they changed.
+
+    Only the order sync and sales ledger that have synced are merged into and
+    reported. Until then they hold no or partial state, where a single merged
+    order would be pushed as the whole count.
+    """
+    order_sync = client.order_sync if client.order_sync.last_sync else None
+    sales = client.sales if client.sales.last_sync else None
+    for order in orders:
+        if order_sync is not None:
+            order_sync.merge(order)
+        if sales is not None:
+            sales.merge(order)
+    values: dict[str, Any] = {}
+    if order_sync is not None:
+        values.update(unfulfilled_order_values(order_sync))
+    if sales is not None:
+        values.update(sales_values(sales))
+    return values
+
+
+def _count_url(url: str) -> str:
+    """Return a url asking for the smallest page, for endpoints read for totals."""
+    return _with_page(url, COUNT_PAGE_LIMIT, 0)
+
+
+def _total_parser(key: str) -> Callable[[Any], dict[str, Any]]:
+    """Return a parser reading the total of a search response into key.
+
+    Responses without ``total`` fall back to the Post-Order pagination
+    summary, where with one result per page the page count is the total.
+    """
+
+    def parse(data: Any) -> dict[str, Any]:
+        if (total := data.get("total")) is None:
+            pagination = data.get("paginationOutput", {})
+            total = pagination.get("totalEntries", pagination.get("totalPages"))
+        if total is None:
+            raise ValueError(f"Response has no total for {key}")
+        return {key: int(total)}
+
+    return parse
+
+
+async def _async_fetch_inventory(
+    client: EbayApiClient, endpoint: EbayEndpoint, access_token: str
+) -> dict[str, Any]:
+    """Advance the inventory sync and report SKUs low on stock."""
+    await client.inventory.async_sync(client, access_token, endpoint.timeout)
+    return inventory_values(client.inventory)
+
+
+async def _async_fetch_traffic_report(
+    client: EbayApiClient, endpoint: EbayEndpoint, access_token: str
+) -> dict[str, Any]:
+    """Load the traffic report into the listing columns and rank listings."""
+    response = await client.async_get(endpoint.url, access_token, endpoint.timeout)
+    # A report row per listing is too much work for the event loop in large
+    # stores; only this coroutine touches the columns while it runs
+    await asyncio.get_running_loop().run_in_executor(
+        None, client.traffic.update, response.data
+    )
+    return traffic_values(client.traffic)
+
+
+def traffic_values(store: ListingTrafficStore) -> dict[str, Any]:
+    """Return the traffic sensor values and listing rankings of the store."""
+    impressions = sum(store.impressions)
+    page_views = sum(store.page_views)
+    rates = store.click_through_rates()
+    # Rates of barely seen listings are noise, so only rank the rest by rate
+    ranked = [
+        row
+        for row, shown in enumerate(store.impressions)
+        if shown >= TRAFFIC_MIN_IMPRESSIONS
+    ]
+    impressions_change = store.changes("impressions")
+    page_views_change = store.changes("page_views")
+
+    impressions_attributes: dict[str, Any] = {
+        "top_listings": [
+            store.listing(row, rates) for row in store.top(store.impressions)
+        ],
+    }
+    if impressions_change is not None:
+        impressions_attributes["rising_listings"] = [
+            {**store.listing(row, rates), "change": impressions_change[row]}
+            for row in store.top(impressions_change)
+            if impressions_change[row] > 0
+        ]
+        impressions_attributes["falling_listings"] = [
+            {**store.listing(row, rates), "change": impressions_change[row]}
+            for row in store.bottom(impressions_change)
+            if impressions_change[row] < 0
+        ]
+
+    return {
+        "ebay_listing_impressions": impressions,
+        "ebay_listing_page_views": page_views,
+        "ebay_click_through_rate": (
+            round(page_views / impressions * 100, 2) if impressions else 0
+        ),
+        "ebay_listing_impressions_change": (
+            sum(impressions_change) if impressions_change is not None else None
+        ),
+        "ebay_listing_page_views_change": (
+            sum(page_views_change) if page_views_change is not None else None
+        ),
+        "ebay_listing_impressions_attributes": impressions_attributes,
+        "ebay_click_through_rate_attributes": {
+            "top_listings": [
+                store.listing(row, rates) for row in store.top(rates, rows=ranked)
+            ],
+            "bottom_listings": [
+                store.listing(row, rates) for row in store.bottom(rates, rows=ranked)
+            ],
+        },
+    }
+
+
+ENDPOINTS: tuple[EbayEndpoint, ...] = (
+    EbayEndpoint(
+        name="unfulfilled_orders",
+        url=UNFULFILLED_ORDERS_URL,
+        group=GROUP_ORDERS,
+        keys=(
+            "ebay_orders_due_today",
+            "ebay_orders_due_tomorrow",
+            "ebay_orders_overdue",
+            "ebay_orders_due_soon",
+            "ebay_orders_due_today_attributes",
+            "ebay_total_unfulfilled_orders",
+            "ebay_orders_awaiting_payment",
+        ),
+        fetch=_async_fetch_unfulfilled_orders,
+    ),
+    EbayEndpoint(
+        name="sales",
+        url=CREATED_ORDERS_URL,
+        group=GROUP_ORDERS,
+        keys=(
+            "ebay_sales_currency",
+            *(
+                key
+                for days in SALES_WINDOWS
+                for key in (
+                    f"ebay_revenue_{days}d",
+                    f"ebay_average_order_value_{days}d",
+                    f"ebay_units_sold_{days}d",
+                    f"ebay_orders_{days}d",
+                    f"ebay_sales_{days}d_attributes",
                 )
-        funds_reponse = await session.get(
-            SELLER_FUNDS_SUMMARY_URL,
-            headers={"Authorization": "Bearer " + access_token},
+            ),
+        ),
+        fetch=_async_fetch_sales,
+    ),
+    EbayEndpoint(
+        name="fulfilled_orders",
+        url=_count_url(FULFILLED_ORDERS_URL),
+        group=GROUP_ORDERS,
+        keys=("ebay_fulfilled_orders",),
+        parse=_total_parser("ebay_fulfilled_orders"),
+    ),
+    EbayEndpoint(
+        name="cancelled_orders",
+        url=_count_url(CANCELLED_ORDERS_URL),
+        group=GROUP_ORDERS,
+        keys=("ebay_cancelled_orders",),
+        parse=_total_parser("ebay_cancelled_orders"),
+    ),
+    EbayEndpoint(
+        name="return_requests",
+        url=_count_url(RETURN_REQUESTS_URL),
+        group=GROUP_REQUESTS,
+        keys=("ebay_return_requests",),
+        parse=_total_parser("ebay_return_requests"),
+        low_priority=True,
+    ),
+    EbayEndpoint(
+        name="cancellation_requests",
+        url=_count_url(CANCELLATION_REQUESTS_URL),
+        group=GROUP_REQUESTS,
+        keys=("ebay_cancellation_requests",),
+        parse=_total_parser("ebay_cancellation_requests"),
+        low_priority=True,
+    ),
+    EbayEndpoint(
+        name="active_listings",
+        url=ACTIVE_LISTINGS_URL,
+        group=GROUP_LISTINGS,
+        keys=("ebay_active_listings",),
+        parse=_total_parser("ebay_active_listings"),
+        low_priority=True,
+    ),
+    EbayEndpoint(
+        name="inventory",
+        url=INVENTORY_URL,
+        group=GROUP_LISTINGS,
+        keys=("ebay_low_stock", "ebay_low_stock_attributes", "ebay_watched_skus"),
+        fetch=_async_fetch_inventory,
+        low_priority=True,
+    ),
+    EbayEndpoint(
+        name="traffic_report",
+        url=TRAFFIC_REPORT_URL,
+        group=GROUP_TRAFFIC,
+        keys=(
+            "ebay_listing_impressions",
+            "ebay_listing_page_views",
+            "ebay_click_through_rate",
+            "ebay_listing_impressions_change",
+            "ebay_listing_page_views_change",
+            "ebay_listing_impressions_attributes",
+            "ebay_click_through_rate_attributes",
+        ),
+        fetch=_async_fetch_traffic_report,
+        timeout=TRAFFIC_REPORT_TIMEOUT,
+        low_priority=True,
+    ),
+)
+
+
+def async_create_websession() -> ClientSession:
+    """Create a pooled keep-alive HTTP session for eBay API requests."""
+    connector = TCPConnector(
+        limit_per_host=HTTP_LIMIT_PER_HOST,
+        ttl_dns_cache=HTTP_DNS_CACHE_TTL,
+        keepalive_timeout=HTTP_KEEPALIVE_TIMEOUT,
+    )
+    return ClientSession(connector=connector)
+
+
+@dataclass
+class EbayResponse:
+    """Status, ETag, decoded body and Location of one eBay response."""
+
+    status: int
+    etag: str | None
+    data: Any
+    location: str | None = None
+
+
+@dataclass
+class EbayQuota:
+    """The tightest call quota eBay reports for one API."""
+
+    limit: int
+    remaining: int
+    reset: datetime | None
+
+
+class _TokenBucket:
+    """Pace requests to one API, pausing refills after a 429."""
+
+    def __init__(self, rate: float, capacity: float) -> None:
+        """Initialize a full bucket."""
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+
+    def reserve(self) -> float:
+        """Take a token and return how many seconds to wait before using it."""
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        self.tokens -= 1
+        return max(0.0, -self.tokens / self.rate, self.blocked_until - now)
+
+    def block(self, seconds: float) -> None:
+        """Empty the bucket and stop handing out tokens for ``seconds``."""
+        now = time.monotonic()
+        self.tokens = min(self.tokens, 0.0)
+        self.blocked_until = max(self.blocked_until, now + seconds)
+
+
+class EbayRateLimitGovernor:
+    """Track eBay call quotas and slow down before they run out.
+
+    Quotas come from the Developer Analytics ``rate_limit`` resource, the
+    application quota every installation on the same keyset draws from, and
+    ``user_rate_limit``; per API the tightest of them counts. They are
+    decremented locally with every call made since that snapshot. While an
+    API has less than ``QUOTA_RESERVE_FRACTION`` of its quota left, low
+    priority endpoints are deferred; once it is exhausted every endpoint is.
+    A 429 response empties that API's token bucket for a jittered,
+    exponentially growing delay.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the governor with unknown quotas."""
+        self.quotas: dict[str, EbayQuota] = {}
+        self.calls: Counter[str] = Counter()
+        self.calls_since_update: Counter[str] = Counter()
+        self.rate_limited = 0
+        self.deferred = 0
+        self.last_update: datetime | None = None
+        self._buckets: dict[str, _TokenBucket] = {}
+        self._strikes: Counter[str] = Counter()
+
+    def needs_update(self, now: datetime) -> bool:
+        """Return True if the quota snapshot is missing, old or past a reset."""
+        if self.last_update is None:
+            return True
+        if now - self.last_update >= RATE_LIMIT_REFRESH_INTERVAL:
+            return True
+        return any(
+            quota.reset is not None and quota.reset <= now
+            for quota in self.quotas.values()
         )
-        if fulfilled_response.status == 200:
-            data = await fulfilled_response.json()
-            fulfilled_total = data.get("total", 0)
 
-        cancelled_response = await session.get(
-            CANCELLED_ORDERS_URL,
-            headers={"Authorization": "Bearer " + access_token},
+    def update(self, snapshots: Iterable[Any], now: datetime) -> None:
+        """Store the tightest quota per API of ``rate_limit`` responses."""
+        quotas: dict[str, EbayQuota] = {}
+        for api in (api for data in snapshots for api in data.get("rateLimits", [])):
+            name = re.sub("[^a-z]", "", api.get("apiName", "").lower())
+            for resource in api.get("resources", []):
+                for rate in resource.get("rates", []):
+                    if "remaining" not in rate or "limit" not in rate:
+                        continue
+                    quota = quotas.get(name)
+                    if quota is not None and quota.remaining <= rate["remaining"]:
+                        continue
+                    reset = rate.get("reset")
+                    quotas[name] = EbayQuota(
+                        limit=rate["limit"],
+                        remaining=rate["remaining"],
+                        reset=dt.parse_datetime(reset) if reset else None,
+                    )
+        self.quotas = quotas
+        self.calls_since_update.clear()
+        self.last_update = now
+
+    def remaining(self, api: str) -> int | None:
+        """Return the calls left for an API, or None if its quota is unknown."""
+        if (quota := self.quotas.get(api)) is None:
+            return None
+        return quota.remaining - self.calls_since_update[api]
+
+    def should_defer(self, endpoint: EbayEndpoint) -> bool:
+        """Return True if an endpoint refresh should wait for the quota."""
+        api = api_name(endpoint.url)
+        if (remaining := self.remaining(api)) is None:
+            return False
+        if remaining <= 0:
+            return True
+        reserve = self.quotas[api].limit * QUOTA_RESERVE_FRACTION
+        return endpoint.low_priority and remaining < reserve
+
+    def reserve(self, api: str) -> float:
+        """Return the delay before the next call to an API may start."""
+        if (bucket := self._buckets.get(api)) is None:
+            bucket = self._buckets[api] = _TokenBucket(REQUEST_RATE, REQUEST_BURST)
+        return bucket.reserve()
+
+    def record_call(self, api: str, status: int) -> None:
+        """Count a completed call and reset the backoff on success."""
+        self.calls[api] += 1
+        self.calls_since_update[api] += 1
+        if status != 429:
+            self._strikes.pop(api, None)
+
+    def rate_limited_by(self, api: str, retry_after: str | None) -> None:
+        """Back off an API after eBay answered 429 Too Many Requests."""
+        self.rate_limited += 1
+        self._strikes[api] += 1
+        delay = min(
+            RATE_LIMIT_BACKOFF_BASE * 2 ** (self._strikes[api] - 1),
+            RATE_LIMIT_BACKOFF_MAX,
         )
-        if cancelled_response.status == 200:
-            data = await cancelled_response.json()
-            cancelled_total = data.get("total", 0)
+        delay *= random.uniform(0.5, 1.5)
+        if retry_after and retry_after.isdigit():
+            delay = max(delay, float(retry_after))
+        _LOGGER.debug("eBay %s API rate limited, backing off %.1fs", api, delay)
+        self.reserve(api)
+        self._buckets[api].block(delay)
+
+
+class EbayApiClient:
+    """Fetch eBay endpoints concurrently over a single HTTP session."""
+
+    def __init__(
+        self,
+        session: ClientSession,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        cache: EbayResponseCache | None = None,
+        semaphore: asyncio.Semaphore | None = None,
+    ) -> None:
+        """Initialize the client.
+
+        Pass a shared ``semaphore`` to cap concurrency across several clients.
+        """
+        self.session = session
+        self._semaphore = semaphore or asyncio.Semaphore(max_concurrency)
+        self.order_sync = EbayOrderSync()
+        self.sales = EbaySalesLedger()
+        # One modified-orders query per refresh feeds both of them
+        self.order_deltas = EbayOrderDeltas(self.order_sync, self.sales)
+        self.traffic = ListingTrafficStore()
+        self.inventory = EbayInventoryIndex()
+        self.governor = EbayRateLimitGovernor()
+        self.metrics = EbayMetrics()
+        self.breaker = EbayCircuitBreaker()
+        self.cache = cache
+        # Returns a client credentials token, for application-level APIs
+        self.application_token: Callable[[], Awaitable[str]] | None = None
+        self._quota_task: asyncio.Task[None] | None = None
+
+    async def async_get(
+        self,
+        url: str,
+        access_token: str,
+        timeout: float,
+        etag: str | None = None,
+    ) -> EbayResponse:
+        """GET a url, raising on an error status.
+
+        A 304 answer to ``etag`` returns no data.
+        """
+        return await self.async_request("GET", url, access_token, timeout, etag=etag)
+
+    async def async_request(
+        self,
+        method: str,
+        url: str,
+        access_token: str,
+        timeout: float,
+        *,
+        etag: str | None = None,
+        payload: dict[str, Any] | None = None,
+    ) -> EbayResponse:
+        """Send a request with an optional JSON payload, raising on an error status.
+
+        429 responses are retried after the governor's backoff delay; an
+        empty body decodes to None.
+        """
+        api = api_name(url)
+        headers = {"Authorization": "Bearer " + access_token}
+        if etag is not None:
+            headers["If-None-Match"] = etag
+        for attempt in range(RATE_LIMIT_MAX_RETRIES + 1):
+            if delay := self.governor.reserve(api):
+                await asyncio.sleep(delay)
+            async with self._semaphore, asyncio.timeout(timeout):
+                async with self.session.request(
+                    method, url, headers=headers, json=payload
+                ) as response:
+                    self.governor.record_call(api, response.status)
+                    if response.status == 429 and attempt < RATE_LIMIT_MAX_RETRIES:
+                        self.governor.rate_limited_by(
+                            api, response.headers.get("Retry-After")
+                        )
+                        continue
+                    if response.status == 304 or response.status >= 400:
+                        self.metrics.record_request(
+                            api, response.status, response.content_length, attempt
+                        )
+                        response.raise_for_status()
+                        return EbayResponse(304, etag, None)
+                    body = await response.read()
+                    self.metrics.record_request(
+                        api, response.status, len(body), attempt
+                    )
+                    return EbayResponse(
+                        response.status,
+                        response.headers.get("ETag"),
+                        await async_json_loads(body) if body else None,
+                        response.headers.get("Location"),
+                    )
+
+    async def async_get_json(self, url: str, access_token: str, timeout: float) -> Any:
+        """GET a url and decode the JSON body, raising on a non-200 status."""
+        return (await self.async_get(url, access_token, timeout)).data
+
+    async def async_update_quota(self, access_token: str) -> None:
+        """Refresh the governor's quota snapshot when it is due.
+
+        Groups finding the snapshot stale together join the one update that
+        is running instead of each reading the quotas. The application quota
+        needs an application token, so it is only read when
+        ``application_token`` is set.
+        """
+        if self._quota_task is None:
+            if not self.governor.needs_update(dt.utcnow()):
+                return
+            self._quota_task = asyncio.create_task(
+                self._async_update_quota(access_token)
+            )
+            self._quota_task.add_done_callback(self._quota_done)
+        await asyncio.shield(self._quota_task)
+
+    def _quota_done(self, task: asyncio.Task[None]) -> None:
+        """Let the next stale snapshot start a new update."""
+        self._quota_task = None
+        if not task.cancelled():
+            # Retrieved here too, in case every caller was cancelled
+            task.exception()
+
+    async def _async_update_quota(self, access_token: str) -> None:
+        """Read the user and application quotas into the governor."""
+        now = dt.utcnow()
+        requests = [
+            self.async_get_json(
+                USER_RATE_LIMIT_URL, access_token, DEFAULT_ENDPOINT_TIMEOUT
+            )
+        ]
+        if self.application_token is not None:
+            requests.append(self._async_get_application_quota(self.application_token))
+        snapshots = []
+        for result in await asyncio.gather(*requests, return_exceptions=True):
+            if isinstance(result, Exception):
+                _LOGGER.debug("Unable to read eBay rate limits: %r", result)
+            elif isinstance(result, BaseException):
+                raise result
+            else:
+                snapshots.append(result)
+        if snapshots:
+            self.governor.update(snapshots, now)
 
-        return_response = await session.get(
-            RETURN_REQUESTS_URL,
-            headers={"Authorization": "Bearer " + access_token},
+    async def _async_get_application_quota(
+        self, application_token: Callable[[], Awaitable[str]]
+    ) -> Any:
+        """Read the application quota of the developer keyset."""
+        return await self.async_get_json(
+            RATE_LIMIT_URL, await application_token(), DEFAULT_ENDPOINT_TIMEOUT
         )
-        if return_response.status == 200:
-            data = await return_response.json()
-            return_requests = data.get("total", 0)
 
-        cancellation_req_response = await session.get(
-            CANCELLATION_REQUESTS_URL,
-            headers={"Authorization": "Bearer " + access_token},
+    async def async_iter_pages(
+        self,
+        url: str,
+        access_token: str,
+        *,
+        limit: int,
+        window: int,
+        timeout: float = DEFAULT_ENDPOINT_TIMEOUT,
+        offset: int = 0,
+        pages: int | None = None,
+        concurrent: bool = True,
+    ) -> AsyncIterator[Any]:
+        """Yield the pages of an offset-paged search in order, from ``offset``.
+
+        When the first page reports ``total`` the following offsets, up to
+        ``pages`` pages in all, are requested concurrently with at most
+        ``window`` pages in flight so memory stays bounded; otherwise ``next``
+        links are followed. Pages in flight are cancelled when one fails or
+        the iteration is closed early.
+        """
+        page = await self.async_get_json(
+            _with_page(url, limit, offset), access_token, timeout
         )
-        if cancellation_req_response.status == 200:
-            data = await cancellation_req_response.json()
-            cancellation_requests = data.get("total", 0)
+        yield page
+
+        total = page.get("total")
+        if not concurrent or total is None:
+            read = 1
+            while (next_url := page.get("next")) and (pages is None or read < pages):
+                page = await self.async_get_json(next_url, access_token, timeout)
+                yield page
+                read += 1
+            return
+
+        end = total if pages is None else min(total, offset + pages * limit)
+        offsets = iter(range(offset + limit, end, limit))
+        pending: deque[asyncio.Task] = deque()
+
+        def schedule_next() -> None:
+            if (next_offset := next(offsets, None)) is not None:
+                pending.append(
+                    asyncio.create_task(
+                        self.async_get_json(
+                            _with_page(url, limit, next_offset), access_token, timeout
+                        )
+                    )
+                )
 
-        listings_response = await session.get(
-            ACTIVE_LISTINGS_URL,
-            headers={"Authorization": "Bearer " + access_token},
+        for _ in range(window):
+            schedule_next()
+        try:
+            while pending:
+                page = await pending.popleft()
+                schedule_next()
+                yield page
+        finally:
+            for task in pending:
+                task.cancel()
+            # Wait for the cancelled pages so none outlives the iteration or
+            # leaves an unretrieved exception behind
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    async def async_iter_orders(
+        self,
+        url: str,
+        access_token: str,
+        *,
+        limit: int = ORDERS_PAGE_LIMIT,
+        timeout: float = DEFAULT_ENDPOINT_TIMEOUT,
+        concurrent: bool = True,
+    ) -> AsyncIterator[dict[str, Any]]:
+        """Yield every order of a Fulfillment API search, one page at a time.
+
+        Pages are read ``ORDERS_PAGE_WINDOW`` at a time by ``async_iter_pages``.
+        """
+        async with aclosing(
+            self.async_iter_pages(
+                url,
+                access_token,
+                limit=limit,
+                window=ORDERS_PAGE_WINDOW,
+                timeout=timeout,
+                concurrent=concurrent,
+            )
+        ) as pages:
+            async for page in pages:
+                for order in page.get("orders", []):
+                    yield order
+
+    async def _async_fetch_endpoint(
+        self, endpoint: EbayEndpoint, access_token: str
+    ) -> dict[str, Any]:
+        """Fetch and parse a single endpoint, recording its metrics.
+
+        Cached results younger than the group's TTL are returned as is; older
+        ones are revalidated with their ETag where eBay supplied one.
+        """
+        now = dt.utcnow()
+        cached = self.cache.get(endpoint.name) if self.cache else None
+        if cached and cached.is_fresh(CACHE_TTLS[endpoint.group], now):
+            self.cache.hits += 1
+            self.metrics.record_refresh(endpoint.name, 0, cached=True)
+            self.breaker.record_success(endpoint.name, cached.fetched)
+            return cached.data
+        if self.breaker.is_open(endpoint.name, now):
+            raise EbayCircuitOpen(endpoint.name)
+        if self.governor.should_defer(endpoint):
+            raise EbayRequestDeferred(endpoint.name)
+        context = current_endpoint.set(endpoint.name)
+        start = time.monotonic()
+        try:
+            data = await self._async_request_endpoint(endpoint, access_token, cached)
+        except Exception as ex:
+            self.metrics.record_refresh(
+                endpoint.name, time.monotonic() - start, error=True
+            )
+            self.breaker.record_failure(endpoint.name, ex, dt.utcnow())
+            raise
+        finally:
+            current_endpoint.reset(context)
+        self.metrics.record_refresh(endpoint.name, time.monotonic() - start)
+        self.breaker.record_success(endpoint.name, dt.utcnow())
+        return data
+
+    async def _async_request_endpoint(
+        self,
+        endpoint: EbayEndpoint,
+        access_token: str,
+        cached: EbayCacheEntry | None,
+    ) -> dict[str, Any]:
+        """Request an endpoint from eBay and cache the parsed result."""
+        if endpoint.fetch is not None:
+            data = await endpoint.fetch(self, endpoint, access_token)
+            etag = None
+        else:
+            response = await self.async_get(
+                endpoint.url,
+                access_token,
+                endpoint.timeout,
+                cached.etag if cached else None,
+            )
+            if response.status == 304:
+                self.cache.touch(endpoint.name)
+                return cached.data
+            data = endpoint.parse(response.data)
+            etag = response.etag
+        if self.cache is not None:
+            self.cache.set(endpoint.name, data, etag)
+        return data
+
+    async def async_fetch(
+        self,
+        access_token: str,
+        endpoints: Iterable[EbayEndpoint] = ENDPOINTS,
+    ) -> dict[str, Any]:
+        """Fetch every endpoint concurrently and merge what succeeded."""
+        endpoints = tuple(endpoints)
+        await self.async_update_quota(access_token)
+        results = await asyncio.gather(
+            *(
+                self._async_fetch_endpoint(endpoint, access_token)
+                for endpoint in endpoints
+            ),
+            return_exceptions=True,
         )
-        if listings_response.status == 200:
-            data = await listings_response.json()
-            active_listings = data.get("total", 0)
+        data: dict[str, Any] = {}
+        failed: list[str] = []
+        for endpoint, result in zip(endpoints, results):
+            if isinstance(result, EbayCircuitOpen):
+                _LOGGER.debug("Skipping eBay %s until it recovers", endpoint.name)
+                continue
+            if isinstance(result, EbayRequestDeferred):
+                _LOGGER.debug("Deferring eBay %s to save call quota", endpoint.name)
+                self.governor.deferred += 1
+                continue
+            if isinstance(result, Exception):
+                _LOGGER.warning("Error fetching eBay %s: %r", endpoint.name, result)
+                failed.append(endpoint.name)
+                continue
+            if isinstance(result, BaseException):
+                raise result
+            data.update(result)
+        self.metrics.log([endpoint.name for endpoint in endpoints])
+        if endpoints and len(failed) == len(endpoints):
+            raise EbayFetchError(f"All eBay endpoints failed: {', '.join(failed)}")
+        return data
+
+
+async def get_ebay_data(
+    access_token: str,
+    endpoints: Iterable[EbayEndpoint] = ENDPOINTS,
+    client: EbayApiClient | None = None,
+) -> dict[str, Any]:
+    """Fetch the eBay sensor values, keeping whatever endpoints succeeded."""
+    if client is not None:
+        return await client.async_fetch(access_token, endpoints)
+    async with ClientSession() as session:
+        return await EbayApiClient(session).async_fetch(access_token, endpoints)
+
 
-        traffic_response = await session.get(
-            TRAFFIC_REPORT_URL,
-            headers={"Authorization": "Bearer " + access_token},
+async def async_get_user_id(hass: HomeAssistant, access_token: str) -> str:
+    """Return the immutable eBay user id of the account behind a token."""
+    session = async_get_clientsession(hass)
+    async with asyncio.timeout(DEFAULT_ENDPOINT_TIMEOUT):
+        resp = await session.get(
+            IDENTITY_USER_URL, headers={"Authorization": "Bearer " + access_token}
         )
-        if traffic_response.status == 200:
-            data = await traffic_response.json()
-            for record in data.get("records", []):
-                metrics = {
-                    m.get("metricName"): float(m.get("value", 0))
-                    for m in record.get("metricValues", [])
-                }
-                listing_impressions += int(metrics.get("LISTING_IMPRESSION", 0))
-                listing_page_views += int(
-                    metrics.get("LISTING_PAGE_VIEWS", metrics.get("LISTING_VIEWS", 0))
+        resp.raise_for_status()
+        return cast(str, (await resp.json())["userId"])
+
+
+def _token_refused(ex: BaseException) -> bool:
+    """Return True if the token endpoint refused the refresh token itself."""
+    return isinstance(ex, ClientResponseError) and ex.status < 500 and ex.status != 429
+
+
+class EbayTokenManager:
+    """Refresh the OAuth token in the background, ahead of its expiry.
+
+    Data polls only ever wait for a refresh when the token has actually
+    expired, and concurrent callers share a single in-flight refresh.
+    Transient token endpoint failures are retried with exponential backoff.
+    Once eBay refuses the refresh token itself, the timer stops, a
+    reauthentication is started and callers get ``ConfigEntryAuthFailed``.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        oauth_session: config_entry_oauth2_flow.OAuth2Session,
+    ) -> None:
+        """Initialize the token manager."""
+        self.hass = hass
+        self.session = oauth_session
+        self.refreshes = 0
+        self.failures = 0
+        self.auth_failed = False
+        self._refresh_task: asyncio.Task[None] | None = None
+        self._unsub_timer: CALLBACK_TYPE | None = None
+        self._stopped = True
+
+    def _expires_in(self) -> float:
+        """Return the seconds left before the token expires."""
+        return self.session.token.get("expires_at", 0) - time.time()
+
+    async def async_get_access_token(self) -> str:
+        """Return a valid access token, waiting only if it has expired."""
+        if self.auth_failed:
+            raise ConfigEntryAuthFailed("eBay refused the refresh token")
+        if self._expires_in() <= TOKEN_EXPIRY_GRACE:
+            await self.async_refresh()
+        return self.session.token["access_token"]
+
+    async def async_refresh(self) -> None:
+        """Refresh the token, joining a refresh that is already running."""
+        if self._refresh_task is None:
+            self._refresh_task = self.hass.async_create_task(
+                self._async_refresh_with_retry()
+            )
+            self._refresh_task.add_done_callback(self._refresh_done)
+        try:
+            await asyncio.shield(self._refresh_task)
+        except ClientResponseError as ex:
+            if _token_refused(ex):
+                raise ConfigEntryAuthFailed("eBay refused the refresh token") from ex
+            raise
+
+    @callback
+    def _refresh_done(self, task: asyncio.Task[None]) -> None:
+        """Forget the finished refresh and plan the next one."""
+        if self._refresh_task is task:
+            self._refresh_task = None
+        if not task.cancelled() and (ex := task.exception()) is not None:
+            self.failures += 1
+            if _token_refused(ex):
+                # Retrying a refused refresh token only hammers the endpoint
+                _LOGGER.error("eBay refused the refresh token: %r", ex)
+                self.auth_failed = True
+                self._cancel_timer()
+                self.session.config_entry.async_start_reauth(self.hass)
+                return
+            _LOGGER.warning("Error refreshing eBay token: %r", ex)
+        if not self._stopped:
+            self._async_schedule()
+
+    async def _async_refresh_with_retry(self) -> None:
+        """Call the token endpoint, retrying transient failures."""
+        for attempt in range(TOKEN_REFRESH_RETRIES + 1):
+            try:
+                new_token = await self.session.implementation.async_refresh_token(
+                    self.session.token
                 )
-            if listing_impressions:
-                click_through_rate = round(
-                    (listing_page_views / listing_impressions) * 100, 2
+            except ClientResponseError as ex:
+                if _token_refused(ex):
+                    raise
+                if attempt == TOKEN_REFRESH_RETRIES:
+                    raise
+            except (ClientError, asyncio.TimeoutError):
+                if attempt == TOKEN_REFRESH_RETRIES:
+                    raise
+            else:
+                self.hass.config_entries.async_update_entry(
+                    self.session.config_entry,
+                    data={**self.session.config_entry.data, "token": new_token},
                 )
-        await session.close()
-    return {
-        "ebay_orders_due_today": today,
-        "ebay_total_unfulfilled_orders": total,
-        "ebay_orders_awaiting_payment": awaiting_payment,
-        "ebay_fulfilled_orders": fulfilled_total,
-        "ebay_cancelled_orders": cancelled_total,
-        "ebay_return_requests": return_requests,
-        "ebay_cancellation_requests": cancellation_requests,
-        "ebay_active_listings": active_listings,
-        "ebay_listing_impressions": listing_impressions,
-        "ebay_listing_page_views": listing_page_views,
-        "ebay_click_through_rate": click_through_rate,
-    }
+                self.refreshes += 1
+                return
+            delay = TOKEN_REFRESH_BACKOFF * 2**attempt * random.uniform(0.5, 1.5)
+            _LOGGER.debug("Retrying eBay token refresh in %.1fs", delay)
+            await asyncio.sleep(delay)
+
+    @callback
+    def async_start(self) -> CALLBACK_TYPE:
+        """Start refreshing in the background; return a stop callback."""
+        self._stopped = False
+        self._async_schedule()
+        return self.async_stop
+
+    @callback
+    def async_stop(self) -> None:
+        """Stop refreshing in the background, cancelling a running refresh."""
+        self._stopped = True
+        self._cancel_timer()
+        if self._refresh_task is not None:
+            self._refresh_task.cancel()
+            self._refresh_task = None
+
+    @callback
+    def _cancel_timer(self) -> None:
+        """Cancel the planned background refresh."""
+        if self._unsub_timer is not None:
+            self._unsub_timer()
+            self._unsub_timer = None
+
+    @callback
+    def _async_schedule(self) -> None:
+        """Plan the next background refresh ahead of expiry."""
+        self._cancel_timer()
+        delay = max(self._expires_in() - TOKEN_REFRESH_MARGIN, TOKEN_REFRESH_MIN_DELAY)
+        self._unsub_timer = async_call_later(self.hass, delay, self._async_timer_fired)
+
+    @callback
+    def _async_timer_fired(self, _now: datetime) -> None:
+        """Kick off a background refresh."""
+        self._unsub_timer = None
+        if self._refresh_task is None and not self._stopped:
+            self._refresh_task = self.hass.async_create_background_task(
+                self._async_refresh_with_retry(), "ebay token refresh"
+            )
+            self._refresh_task.add_done_callback(self._refresh_done)
 
 
 class ConfigEntryAuth:
@@ -201,10 +1098,20 @@ class ConfigEntryAuth:
         self,
         hass: HomeAssistant,
         oauth_session: config_entry_oauth2_flow.OAuth2Session,
+        client: EbayApiClient,
     ) -> None:
         """Initialize ebay Auth."""
         self.hass = hass
         self.session = oauth_session
+        self.client = client
+        if isinstance(oauth_session.implementation, EbayImplementation):
+            client.application_token = (
+                oauth_session.implementation.async_application_token
+            )
+        self.token_manager = EbayTokenManager(hass, oauth_session)
+        self.coordinators: dict[str, EbayGroupCoordinator] = {}
+        self.webhook: EbayWebhook | None = None
+        self.fulfillment: EbayFulfillmentQueue | None = None
 
 
 class EbayImplementation(config_entry_oauth2_flow.LocalOAuth2Implementation):
@@ -233,6 +1140,8 @@ class EbayImplementation(config_entry_oauth2_flow.LocalOAuth2Implementation):
         self._redirect_uri = redirect_uri
         auth = self.client_id + ":" + self.client_secret
         self._authEncoded = base64.b64encode(str.encode(auth)).decode()
+        self._app_token: str | None = None
+        self._app_token_expires = 0.0
 
     async def async_generate_authorize_url(self, flow_id: str) -> str:
         """Overidge default generate authorize url"""
@@ -273,17 +1182,31 @@ class EbayImplementation(config_entry_oauth2_flow.LocalOAuth2Implementation):
         resp_json = cast(dict, await resp.json())
         return resp_json
 
+    async def async_application_token(self) -> str:
+        """Return a client credentials token for application-level APIs."""
+        if self._app_token is None or self._app_token_expires <= time.time():
+            token = await self._token_request(
+                {"grant_type": "client_credentials", "scope": APPLICATION_SCOPE}
+            )
+            self._app_token = token["access_token"]
+            self._app_token_expires = (
+                time.time() + token["expires_in"] - TOKEN_REFRESH_MARGIN
+            )
+        return self._app_token
+
     async def async_resolve_external_data(self, external_data: Any) -> dict:
         """Overide"""
         """Needed to update the redirect URI"""
         """Resolve the authorization code to tokens."""
-        return await self._token_request(
+        token = await self._token_request(
             {
                 "grant_type": "authorization_code",
                 "code": external_data["code"],
                 "redirect_uri": self._redirect_uri,
             }
         )
+        # eBay doesn't echo the granted scopes, which are the ones requested
+        return {"scope": " ".join(SCOPES), **token}
 
     async def _async_refresh_token(self, token: dict) -> dict:
         """Refresh tokens."""
@@ -293,7 +1216,8 @@ class EbayImplementation(config_entry_oauth2_flow.LocalOAuth2Implementation):
             "refresh_token": token["refresh_token"],
         }
 
-        data["scope"] = " ".join(SCOPES)
+        # Asking for more than the original grant makes eBay refuse the refresh
+        data["scope"] = " ".join(granted_scopes(token))
 
         new_token = await self._token_request(data)
         return {**token, **new_token}
@@ -0,0 +1,139 @@
+"""Low stock binary sensors for the ebay integration."""
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.components.binary_sensor import (
+    BinarySensorDeviceClass,
+    BinarySensorEntity,
+    BinarySensorEntityDescription,
+)
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import STATE_ON
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.restore_state import RestoreEntity
+from homeassistant.util import slugify
+
+from .const import DOMAIN, GROUP_LISTINGS
+from .coordinator import EbayGroupCoordinator
+from .entity import EbayEntity
+
+LOW_STOCK_DESCRIPTION = BinarySensorEntityDescription(
+    key="ebay_low_stock",
+    name="Low Stock",
+    icon="mdi:package-variant-remove",
+    device_class=BinarySensorDeviceClass.PROBLEM,
+)
+
+
+async def async_setup_entry(
+    hass: HomeAssistant, entry: ConfigEntry, async_add_entities: AddEntitiesCallback
+) -> None:
+    """Set up the low stock sensor and one sensor per watched SKU."""
+    api = hass.data[DOMAIN][entry.entry_id]
+    coordinator = api.coordinators[GROUP_LISTINGS]
+    if not coordinator.provides("ebay_low_stock"):
+        # The inventory sync is turned off in the options
+        return
+    entities: list[BinarySensorEntity] = [
+        EbayLowStockBinarySensor(coordinator, LOW_STOCK_DESCRIPTION, entry)
+    ]
+    entities.extend(
+        EbayWatchedSkuBinarySensor(
+            coordinator,
+            BinarySensorEntityDescription(
+                key=f"ebay_low_stock_{slugify(sku)}",
+                name=f"Low Stock {sku}",
+                icon="mdi:package-variant",
+                device_class=BinarySensorDeviceClass.PROBLEM,
+            ),
+            entry,
+            sku,
+        )
+        for sku in api.client.inventory.thresholds
+    )
+    async_add_entities(entities)
+
+
+class EbayRestoreBinarySensor(EbayEntity, BinarySensorEntity, RestoreEntity):
+    """A low stock sensor that shows its last state until the first refresh."""
+
+    data_key: str
+    _restored: bool | None = None
+
+    async def async_added_to_hass(self) -> None:
+        """Restore the last state while the group has no data yet."""
+        await super().async_added_to_hass()
+        if self.coordinator.data is None and (
+            last_state := await self.async_get_last_state()
+        ):
+            self._restored = last_state.state == STATE_ON
+
+    @property
+    def available(self) -> bool:
+        """Unavailable once the inventory sync is stale."""
+        if self.coordinator.data is None:
+            return self._restored is not None
+        return super().available and self.coordinator.is_fresh(self.data_key)
+
+
+class EbayLowStockBinarySensor(EbayRestoreBinarySensor):
+    """On while any SKU is at or below its low stock threshold."""
+
+    data_key = "ebay_low_stock"
+
+    @property
+    def is_on(self) -> bool | None:
+        """Return True if a SKU is low on stock."""
+        if self.coordinator.data is None:
+            return self._restored
+        return self.coordinator.data.get("ebay_low_stock")
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any] | None:
+        """Counts and the lowest SKUs."""
+        return (self.coordinator.data or {}).get("ebay_low_stock_attributes")
+
+
+class EbayWatchedSkuBinarySensor(EbayRestoreBinarySensor):
+    """On while one SKU with its own threshold is low on stock."""
+
+    data_key = "ebay_watched_skus"
+
+    def __init__(
+        self,
+        coordinator: EbayGroupCoordinator,
+        description: BinarySensorEntityDescription,
+        entry: ConfigEntry,
+        sku: str,
+    ) -> None:
+        """Initialize the sensor of a watched SKU."""
+        super().__init__(coordinator, description, entry)
+        self.sku = sku
+
+    @property
+    def _state(self) -> dict[str, Any] | None:
+        """Return the quantity, threshold and state of the SKU."""
+        watched = (self.coordinator.data or {}).get("ebay_watched_skus", {})
+        return watched.get(self.sku)
+
+    @property
+    def is_on(self) -> bool | None:
+        """Return True if the SKU is low on stock, None if it isn't indexed."""
+        if self.coordinator.data is None:
+            return self._restored
+        if (state := self._state) is None or state["quantity"] is None:
+            return None
+        return state["low"]
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any] | None:
+        """The SKU, its quantity and threshold."""
+        if (state := self._state) is None:
+            return {"sku": self.sku}
+        return {
+            "sku": self.sku,
+            "quantity": state["quantity"],
+            "threshold": state["threshold"],
+        }
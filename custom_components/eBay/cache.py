@@ -0,0 +1,80 @@
+"""Persistent cache of eBay endpoint results for the ebay integration."""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+import homeassistant.util.dt as dt
+
+from .const import CACHE_SAVE_DELAY, CACHE_STORAGE_VERSION, DOMAIN
+
+
+@dataclass
+class EbayCacheEntry:
+    """The last good parsed result of one endpoint."""
+
+    data: dict[str, Any]
+    fetched: datetime
+    etag: str | None = None
+
+    def is_fresh(self, ttl: timedelta, now: datetime) -> bool:
+        """Return True if the result is younger than ttl."""
+        return now - self.fetched < ttl
+
+
+class EbayResponseCache:
+    """Endpoint results kept in a HA ``Store`` so they survive restarts.
+
+    Entries hold the parsed sensor values rather than raw payloads, together
+    with the time they were fetched and the ETag eBay sent, if any.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry_id: str) -> None:
+        """Initialize an empty cache for a config entry."""
+        self._store: Store[dict[str, Any]] = Store(
+            hass, CACHE_STORAGE_VERSION, f"{DOMAIN}.{entry_id}.cache"
+        )
+        self.entries: dict[str, EbayCacheEntry] = {}
+        self.hits = 0
+
+    async def async_load(self) -> None:
+        """Load the entries saved by a previous run."""
+        if (stored := await self._store.async_load()) is None:
+            return
+        for name, entry in stored.items():
+            if (fetched := dt.parse_datetime(entry["fetched"])) is None:
+                continue
+            self.entries[name] = EbayCacheEntry(entry["data"], fetched, entry["etag"])
+
+    async def async_remove(self) -> None:
+        """Delete the stored cache when the config entry is removed."""
+        await self._store.async_remove()
+
+    def get(self, name: str) -> EbayCacheEntry | None:
+        """Return the cached result of an endpoint."""
+        return self.entries.get(name)
+
+    def set(self, name: str, data: dict[str, Any], etag: str | None = None) -> None:
+        """Store a fresh endpoint result and schedule a save."""
+        self.entries[name] = EbayCacheEntry(data, dt.utcnow(), etag)
+        self._store.async_delay_save(self._data_to_save, CACHE_SAVE_DELAY)
+
+    def touch(self, name: str) -> None:
+        """Mark a cached result as confirmed unchanged (HTTP 304)."""
+        self.hits += 1
+        self.entries[name].fetched = dt.utcnow()
+        self._store.async_delay_save(self._data_to_save, CACHE_SAVE_DELAY)
+
+    def _data_to_save(self) -> dict[str, Any]:
+        """Return the entries in their stored form."""
+        return {
+            name: {
+                "data": entry.data,
+                "fetched": entry.fetched.isoformat(),
+                "etag": entry.etag,
+            }
+            for name, entry in self.entries.items()
+        }
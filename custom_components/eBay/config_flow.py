@@ -1,16 +1,52 @@
 """Config flow for ebay."""
+from collections.abc import Mapping
 import logging
-from .const import DOMAIN
+from typing import Any
+
+from aiohttp import ClientError
+import voluptuous as vol
+
+from .api import ENDPOINTS, async_get_user_id
+from .const import (
+    CONF_ENDPOINTS,
+    CONF_LOW_STOCK_SKUS,
+    CONF_LOW_STOCK_THRESHOLD,
+    CONF_STALE_REFRESHES,
+    CONF_STATISTICS_ID,
+    CONF_USER_ID,
+    DEFAULT_ACCOUNT_NAME,
+    DEFAULT_LOW_STOCK_THRESHOLD,
+    DEFAULT_STALE_REFRESHES,
+    DOMAIN,
+)
 from homeassistant import config_entries
+from homeassistant.const import CONF_NAME
+from homeassistant.core import callback
+from homeassistant.data_entry_flow import FlowResult
 from homeassistant.helpers import config_entry_oauth2_flow
-from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.selector import (
+    NumberSelector,
+    NumberSelectorConfig,
+    NumberSelectorMode,
+    SelectSelector,
+    SelectSelectorConfig,
+    TextSelector,
+    TextSelectorConfig,
+)
+from homeassistant.util import slugify
 
 
-from yarl import URL
-import jwt
-import secrets
-
-DATA_JWT_SECRET = "oauth2_jwt_secret"
+def _parse_thresholds(text: str) -> dict[str, int]:
+    """Parse ``SKU=threshold`` lines into per-SKU thresholds."""
+    thresholds: dict[str, int] = {}
+    for line in text.splitlines():
+        if not (line := line.strip()):
+            continue
+        sku, separator, value = line.rpartition("=")
+        if not separator or not sku.strip():
+            raise ValueError(f"Not a SKU=threshold line: {line}")
+        thresholds[sku.strip()] = int(value)
+    return thresholds
 
 
 class OAuth2FlowHandler(
@@ -26,15 +62,161 @@ class OAuth2FlowHandler(
         """Return logger."""
         return logging.getLogger(__name__)
 
-    async def async_oauth_create_entry(self, data: dict) -> dict:
+    _oauth_data: dict[str, Any]
+    reauth_entry: config_entries.ConfigEntry | None = None
+
+    @staticmethod
+    @callback
+    def async_get_options_flow(
+        config_entry: config_entries.ConfigEntry,
+    ) -> config_entries.OptionsFlow:
+        """Return the options flow of an eBay account."""
+        return EbayOptionsFlowHandler(config_entry)
+
+    async def async_oauth_create_entry(self, data: dict) -> FlowResult:
         """Create an entry for the flow.
-        Ok to override if you want to fetch extra info or even add another step.
+        Each eBay account, told apart by its eBay user id, is added once and
+        asks for a name first.
+        A reauthorized account keeps its entry and only gets the new token.
+        """
+        try:
+            user_id = await async_get_user_id(self.hass, data["token"]["access_token"])
+        except (ClientError, TimeoutError, KeyError):
+            self.logger.exception("Could not read the eBay user id")
+            return self.async_abort(reason="cannot_connect")
+        data = {**data, CONF_USER_ID: user_id}
+
+        if (entry := self.reauth_entry) is not None:
+            if entry.data.get(CONF_USER_ID, user_id) != user_id:
+                return self.async_abort(reason="wrong_account")
+            if any(
+                other.unique_id == user_id and other.entry_id != entry.entry_id
+                for other in self._async_current_entries(include_ignore=False)
+            ):
+                return self.async_abort(reason="already_configured")
+            if CONF_USER_ID not in entry.data:
+                # Entries added before they were identified by the eBay user
+                # id keep the statistics ids they were recorded under
+                data[CONF_STATISTICS_ID] = slugify(entry.unique_id or entry.title)
+            self.hass.config_entries.async_update_entry(
+                entry, unique_id=user_id, data={**entry.data, **data}
+            )
+            await self.hass.config_entries.async_reload(entry.entry_id)
+            return self.async_abort(reason="reauth_successful")
+
+        await self.async_set_unique_id(user_id)
+        self._abort_if_unique_id_configured()
+        self._oauth_data = data
+        return await self.async_step_account()
+
+    async def async_step_reauth(self, entry_data: Mapping[str, Any]) -> FlowResult:
+        """Authorize an account again.
+
+        Started when its refresh token is refused, or to grant an account the
+        write scope it was added without.
         """
-        return self.async_create_entry(title=DOMAIN, data=data)
+        self.reauth_entry = self.hass.config_entries.async_get_entry(
+            self.context["entry_id"]
+        )
+        return await self.async_step_reauth_confirm()
+
+    async def async_step_reauth_confirm(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Confirm signing in to eBay again."""
+        if self.reauth_entry is None:
+            return self.async_abort(reason="reauth_entry_missing")
+        if user_input is None:
+            return self.async_show_form(
+                step_id="reauth_confirm",
+                description_placeholders={"account": self.reauth_entry.title},
+            )
+        return await self.async_step_pick_implementation(
+            user_input={"implementation": self.reauth_entry.data["auth_implementation"]}
+        )
+
+    async def async_step_account(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Name the eBay account this entry monitors."""
+        if user_input is None:
+            return self.async_show_form(
+                step_id="account",
+                data_schema=vol.Schema(
+                    {vol.Required(CONF_NAME, default=DEFAULT_ACCOUNT_NAME): str}
+                ),
+            )
+        return self.async_create_entry(
+            title=user_input[CONF_NAME], data=self._oauth_data
+        )
+
+
+class EbayOptionsFlowHandler(config_entries.OptionsFlowWithConfigEntry):
+    """Choose what an eBay account polls and when its sensors go stale or low."""
 
-    async def async_step_user(self, user_input=None):
-        """Handle a flow start."""
-        if self.hass.config_entries.async_entries(DOMAIN):
-            return self.async_abort(reason="already_setup")
+    async def async_step_init(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Edit the polled endpoints, staleness and low stock thresholds."""
+        errors: dict[str, str] = {}
+        if user_input is not None:
+            try:
+                thresholds = _parse_thresholds(user_input.get(CONF_LOW_STOCK_SKUS, ""))
+            except ValueError:
+                errors[CONF_LOW_STOCK_SKUS] = "invalid_low_stock_skus"
+            if not user_input[CONF_ENDPOINTS]:
+                errors[CONF_ENDPOINTS] = "no_endpoints"
+            if not errors:
+                self.options.update(
+                    {
+                        CONF_ENDPOINTS: user_input[CONF_ENDPOINTS],
+                        CONF_STALE_REFRESHES: int(user_input[CONF_STALE_REFRESHES]),
+                        CONF_LOW_STOCK_THRESHOLD: int(
+                            user_input[CONF_LOW_STOCK_THRESHOLD]
+                        ),
+                        CONF_LOW_STOCK_SKUS: thresholds,
+                    }
+                )
+                return self.async_create_entry(title="", data=self.options)
 
-        return await super().async_step_user(user_input)
+        names = [endpoint.name for endpoint in ENDPOINTS]
+        thresholds_text = "\n".join(
+            f"{sku}={threshold}"
+            for sku, threshold in self.options.get(CONF_LOW_STOCK_SKUS, {}).items()
+        )
+        return self.async_show_form(
+            step_id="init",
+            data_schema=vol.Schema(
+                {
+                    vol.Required(
+                        CONF_ENDPOINTS, default=self.options.get(CONF_ENDPOINTS, names)
+                    ): SelectSelector(
+                        SelectSelectorConfig(
+                            options=names, multiple=True, translation_key=CONF_ENDPOINTS
+                        )
+                    ),
+                    vol.Required(
+                        CONF_STALE_REFRESHES,
+                        default=self.options.get(
+                            CONF_STALE_REFRESHES, DEFAULT_STALE_REFRESHES
+                        ),
+                    ): NumberSelector(
+                        NumberSelectorConfig(
+                            min=1, max=20, step=1, mode=NumberSelectorMode.BOX
+                        )
+                    ),
+                    vol.Required(
+                        CONF_LOW_STOCK_THRESHOLD,
+                        default=self.options.get(
+                            CONF_LOW_STOCK_THRESHOLD, DEFAULT_LOW_STOCK_THRESHOLD
+                        ),
+                    ): NumberSelector(
+                        NumberSelectorConfig(min=0, step=1, mode=NumberSelectorMode.BOX)
+                    ),
+                    vol.Optional(
+                        CONF_LOW_STOCK_SKUS, default=thresholds_text
+                    ): TextSelector(TextSelectorConfig(multiline=True)),
+                }
+            ),
+            errors=errors,
+        )
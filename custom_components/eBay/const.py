@@ -1,11 +1,30 @@
 """Constants for the ebay integration."""
-from homeassistant.components.sensor import SensorEntityDescription
+from dataclasses import dataclass
+from datetime import timedelta
+
+from homeassistant.components.sensor import SensorDeviceClass, SensorEntityDescription
 
 DOMAIN = "ebay"
+DEFAULT_ACCOUNT_NAME = "eBay"
+# hass.data[DOMAIN] key of the scheduler shared by every account
+DATA_SCHEDULER = "scheduler"
 OAUTH2_AUTHORIZE = "https://auth.ebay.com/oauth2/authorize"
 OAUTH2_TOKEN = "https://api.ebay.com/identity/v1/oauth2/token"
+# Client credentials scope for application-level APIs (notification keys)
+APPLICATION_SCOPE = "https://api.ebay.com/oauth/api_scope"
 # Request seller scopes that are available without enhanced Finances access
 SCOPES = (
+    "https://api.ebay.com/oauth/api_scope/sell.fulfillment",
+    "https://api.ebay.com/oauth/api_scope/sell.analytics.readonly",
+    "https://api.ebay.com/oauth/api_scope/sell.inventory.readonly",
+    "https://api.ebay.com/oauth/api_scope/sell.postorder.readonly",
+    "https://api.ebay.com/oauth/api_scope/commerce.identity.readonly",
+)
+# Write scope the fulfillment services need, and the scopes of accounts
+# authorized before it was requested. Tokens keep the scopes of their grant
+# under "scope", and a refresh may only ask for those.
+FULFILLMENT_SCOPE = "https://api.ebay.com/oauth/api_scope/sell.fulfillment"
+LEGACY_SCOPES = (
     "https://api.ebay.com/oauth/api_scope/sell.fulfillment.readonly",
     "https://api.ebay.com/oauth/api_scope/sell.analytics.readonly",
     "https://api.ebay.com/oauth/api_scope/sell.inventory.readonly",
@@ -14,116 +33,363 @@ SCOPES = (
 UNFULFILLED_ORDERS_URL = "https://api.ebay.com/sell/fulfillment/v1/order?filter=orderfulfillmentstatus:%7BNOT_STARTED%7CIN_PROGRESS%7D"
 FULFILLED_ORDERS_URL = "https://api.ebay.com/sell/fulfillment/v1/order?filter=orderfulfillmentstatus:%7BFULFILLED%7D"
 CANCELLED_ORDERS_URL = "https://api.ebay.com/sell/fulfillment/v1/order?filter=orderfulfillmentstatus:%7BCANCELLED%7D"
+ORDER_URL = "https://api.ebay.com/sell/fulfillment/v1/order/{order_id}"
+SHIPPING_FULFILLMENT_URL = (
+    "https://api.ebay.com/sell/fulfillment/v1/order/{order_id}/shipping_fulfillment"
+)
+MODIFIED_ORDERS_URL = "https://api.ebay.com/sell/fulfillment/v1/order?filter=lastmodifieddate:%5B{since}..%5D"
+CREATED_ORDERS_URL = "https://api.ebay.com/sell/fulfillment/v1/order?filter=creationdate:%5B{since}..%5D"
 RETURN_REQUESTS_URL = "https://api.ebay.com/post-order/v2/return/search"
 CANCELLATION_REQUESTS_URL = "https://api.ebay.com/post-order/v2/cancellation/search"
 ACTIVE_LISTINGS_URL = "https://api.ebay.com/sell/inventory/v1/inventory_item?status=ACTIVE&limit=1"
+INVENTORY_URL = "https://api.ebay.com/sell/inventory/v1/inventory_item"
+BULK_GET_INVENTORY_URL = "https://api.ebay.com/sell/inventory/v1/bulk_get_inventory_item"
 TRAFFIC_REPORT_URL = (
     "https://api.ebay.com/sell/analytics/v1/traffic_report?dimension=LISTING"
     "&metric=LISTING_IMPRESSION,LISTING_VIEWS"
 )
+NOTIFICATION_PUBLIC_KEY_URL = (
+    "https://api.ebay.com/commerce/notification/v1/public_key/{public_key_id}"
+)
+# Identity API user, whose immutable userId is the config entry's unique id
+IDENTITY_USER_URL = "https://apiz.ebay.com/commerce/identity/v1/user/"
+# Developer Analytics quotas: the keyset's application quota, shared by every
+# installation using it and read with an application token, and the user's
+RATE_LIMIT_URL = "https://api.ebay.com/developer/analytics/v1_beta/rate_limit/"
+USER_RATE_LIMIT_URL = "https://api.ebay.com/developer/analytics/v1_beta/user_rate_limit/"
+
+# Entry data keys of the eBay user id, and of the account part of the
+# statistics ids of entries set up before they were identified by it
+CONF_USER_ID = "user_id"
+CONF_STATISTICS_ID = "statistics_id"
+
+# OAuth token refresh: seconds before expiry to refresh in the background,
+# seconds before expiry a poll stops trusting the token and waits for a
+# refresh, the shortest timer delay and the retry policy of failed refreshes
+TOKEN_REFRESH_MARGIN = 600
+TOKEN_EXPIRY_GRACE = 20
+TOKEN_REFRESH_MIN_DELAY = 30
+TOKEN_REFRESH_RETRIES = 3
+TOKEN_REFRESH_BACKOFF = 2.0
+
+# Notification API webhook: entry data keys, how long the webhook counts as
+# healthy after the last valid notification, and the slower reconciliation
+# interval of the orders group while it is healthy
+CONF_WEBHOOK_ID = "webhook_id"
+CONF_VERIFICATION_TOKEN = "verification_token"
+WEBHOOK_HEALTHY_WINDOW = timedelta(hours=2)
+WEBHOOK_RECONCILE_INTERVAL = timedelta(minutes=30)
+# Seconds a public key id that could not be fetched is not looked up again,
+# and seconds no other unknown key is looked up after a failed lookup
+WEBHOOK_KEY_FAILURE_TTL = 3600
+WEBHOOK_KEY_LOOKUP_PAUSE = 60
+
+# Fetch engine tuning: endpoints are requested concurrently up to this cap
+DEFAULT_MAX_CONCURRENCY = 8
+# Seconds allowed per endpoint request; the traffic report is slower to build
+DEFAULT_ENDPOINT_TIMEOUT = 30
+TRAFFIC_REPORT_TIMEOUT = 60
+# Pooled HTTP connector shared by every data request of a config entry
+HTTP_LIMIT_PER_HOST = 8
+HTTP_KEEPALIVE_TIMEOUT = 60
+HTTP_DNS_CACHE_TTL = 300
+# Fulfillment API paging: orders per page (API maximum) and pages in flight
+ORDERS_PAGE_LIMIT = 200
+ORDERS_PAGE_WINDOW = 4
+# Response bodies of at least this many bytes are decoded off the event loop
+JSON_EXECUTOR_THRESHOLD = 256 * 1024
+# Endpoints read only for their total request the smallest page allowed
+COUNT_PAGE_LIMIT = 1
+# Incremental order sync: deltas are requested with this overlap to absorb
+# clock skew, and the whole unfulfilled set is re-downloaded on this schedule
+ORDER_SYNC_OVERLAP = timedelta(minutes=2)
+ORDER_FULL_SYNC_INTERVAL = timedelta(hours=6)
+UNFULFILLED_STATUSES = ("NOT_STARTED", "IN_PROGRESS")
+# Ship-by sensors: the "due soon" window and how many of the most urgent
+# orders are listed as an attribute of the due today sensor
+ORDERS_DUE_SOON_WINDOW = timedelta(hours=12)
+NEXT_ORDERS_DUE_COUNT = 10
+# Sales sensors: rolling windows in local calendar days, ending today, and how
+# often the orders created within the longest window are re-downloaded
+SALES_WINDOWS = (1, 7, 30)
+SALES_FULL_SYNC_INTERVAL = timedelta(hours=24)
+# Traffic sensors: listings named in the ranking attributes, and the
+# impressions a listing needs before it is ranked by click-through rate
+TRAFFIC_TOP_LISTINGS = 5
+TRAFFIC_MIN_IMPRESSIONS = 100
+# Inventory sync: SKUs per page (API maximum) and pages in flight, pages read
+# per refresh once a full pass has indexed the catalog, and SKUs per bulk
+# re-read of the items in new orders (API maximum)
+INVENTORY_PAGE_LIMIT = 200
+INVENTORY_PAGE_WINDOW = 4
+INVENTORY_PAGES_PER_REFRESH = 25
+INVENTORY_BULK_LIMIT = 25
+# Low stock: options keys of the default and per-SKU thresholds (a SKU is low
+# at or below its threshold), the default, how many low SKUs are listed as
+# attributes, and the event fired when a known SKU crosses its threshold
+CONF_LOW_STOCK_THRESHOLD = "low_stock_threshold"
+CONF_LOW_STOCK_SKUS = "low_stock_skus"
+DEFAULT_LOW_STOCK_THRESHOLD = 2
+LOW_STOCK_LISTED = 20
+EVENT_LOW_STOCK = "ebay_low_stock"
+
+# Endpoint refresh groups, each polled by its own coordinator
+GROUP_ORDERS = "orders"
+GROUP_REQUESTS = "requests"
+GROUP_LISTINGS = "listings"
+GROUP_TRAFFIC = "traffic"
+# (fastest, slowest) refresh interval per group. A group starts at its fastest
+# interval, backs off while all its endpoints succeed with the same results and
+# snaps back on change.
+REFRESH_INTERVALS: dict[str, tuple[timedelta, timedelta]] = {
+    GROUP_ORDERS: (timedelta(minutes=2), timedelta(minutes=10)),
+    GROUP_REQUESTS: (timedelta(minutes=10), timedelta(minutes=30)),
+    GROUP_LISTINGS: (timedelta(minutes=30), timedelta(hours=3)),
+    GROUP_TRAFFIC: (timedelta(hours=1), timedelta(hours=6)),
+}
+REFRESH_BACKOFF_FACTOR = 1.5
+# Accounts start their refreshes at golden-ratio spaced offsets
+STAGGER_RATIO = 0.6180339887
+
+# Persistent response cache: results younger than the group's TTL are served
+# without a request, older ones are revalidated with If-None-Match
+CACHE_STORAGE_VERSION = 1
+CACHE_SAVE_DELAY = 30
+CACHE_TTLS: dict[str, timedelta] = {
+    GROUP_ORDERS: timedelta(minutes=1),
+    GROUP_REQUESTS: timedelta(minutes=5),
+    GROUP_LISTINGS: timedelta(minutes=15),
+    GROUP_TRAFFIC: timedelta(minutes=30),
+}
 
+# Circuit breaker: consecutive failures before an endpoint is paused, and
+# the pause, doubling with every further failure up to the maximum
+BREAKER_FAILURE_THRESHOLD = 3
+BREAKER_COOLDOWN = timedelta(minutes=5)
+BREAKER_MAX_COOLDOWN = timedelta(hours=1)
+# Sensors keep their last good value until their endpoint has missed this
+# many of its group's slowest refreshes, then become unavailable
+CONF_STALE_REFRESHES = "stale_refreshes"
+DEFAULT_STALE_REFRESHES = 3
 
-EBAY_QUERIES_SENSOR: tuple[SensorEntityDescription, ...] = (
-    SensorEntityDescription(
+# Options key of the endpoints to poll; sensors of the others aren't created
+CONF_ENDPOINTS = "endpoints"
+
+# Fulfillment writes: shipments sent concurrently per batch, attempts per
+# shipment and the delay before a retry, and how many shipped orders are
+# remembered to drop repeated service calls
+WRITE_BATCH_SIZE = 10
+WRITE_MAX_ATTEMPTS = 3
+WRITE_RETRY_DELAY = 5.0
+WRITE_DEDUPE_SIZE = 1000
+EVENT_FULFILLMENT_RESULT = "ebay_fulfillment_result"
+SERVICE_CREATE_SHIPPING_FULFILLMENT = "create_shipping_fulfillment"
+SERVICE_UPLOAD_TRACKING = "upload_tracking"
+SERVICE_GET_STOCK = "get_stock"
+
+# Refresh metrics: endpoint refresh times kept for the p50/p95 percentiles
+METRICS_WINDOW = 50
+
+# Metric history: sensors sampled into hourly and daily rollups, how long
+# each resolution is kept and how often the history file is written
+HISTORY_STORAGE_VERSION = 1
+HISTORY_SAVE_DELAY = 300
+HISTORY_HOURLY_RETENTION = timedelta(days=14)
+HISTORY_DAILY_RETENTION = timedelta(days=400)
+HISTORY_METRICS = (
+    "ebay_total_unfulfilled_orders",
+    "ebay_fulfilled_orders",
+    "ebay_cancelled_orders",
+    "ebay_return_requests",
+    "ebay_cancellation_requests",
+    "ebay_active_listings",
+    "ebay_listing_impressions",
+    "ebay_listing_page_views",
+    "ebay_click_through_rate",
+    "ebay_orders_1d",
+    "ebay_units_sold_1d",
+)
+
+# Rate-limit governor: how often to re-read eBay's quota snapshot, the share
+# of a daily quota kept for high priority endpoints, per-API request pacing
+# (requests per second and burst) and the backoff applied after a 429
+RATE_LIMIT_REFRESH_INTERVAL = timedelta(minutes=30)
+QUOTA_RESERVE_FRACTION = 0.1
+REQUEST_RATE = 5.0
+REQUEST_BURST = 10.0
+RATE_LIMIT_MAX_RETRIES = 3
+RATE_LIMIT_BACKOFF_BASE = 2.0
+RATE_LIMIT_BACKOFF_MAX = 60.0
+
+
+@dataclass(frozen=True, kw_only=True)
+class EbaySensorEntityDescription(SensorEntityDescription):
+    """Describes an eBay sensor fed by the endpoint coordinators."""
+
+    # Coordinator data key holding the extra state attributes of the sensor
+    attributes_key: str | None = None
+    # Coordinator data key holding the unit, for values in the sales currency
+    unit_key: str | None = None
+
+
+EBAY_QUERIES_SENSOR: tuple[EbaySensorEntityDescription, ...] = (
+    EbaySensorEntityDescription(
         key="ebay_total_unfulfilled_orders",
-        name="eBay Total Unfulfilled Orders",
+        name="Total Unfulfilled Orders",
         icon="mdi:package-variant-closed",
     ),
-    SensorEntityDescription(
+    EbaySensorEntityDescription(
         key="ebay_orders_due_today",
-        name="eBay Orders Due Today",
+        name="Orders Due Today",
         icon="mdi:package-variant-closed",
+        attributes_key="ebay_orders_due_today_attributes",
+    ),
+    EbaySensorEntityDescription(
+        key="ebay_orders_due_tomorrow",
+        name="Orders Due Tomorrow",
+        icon="mdi:calendar-arrow-right",
+    ),
+    EbaySensorEntityDescription(
+        key="ebay_orders_overdue",
+        name="Orders Overdue",
+        icon="mdi:alert-circle-outline",
     ),
-    SensorEntityDescription(
+    EbaySensorEntityDescription(
+        key="ebay_orders_due_soon",
+        name="Orders Due Soon",
+        icon="mdi:clock-alert-outline",
+    ),
+    EbaySensorEntityDescription(
         key="ebay_orders_awaiting_payment",
-        name="eBay Orders Awaiting Payment",
+        name="Orders Awaiting Payment",
         icon="mdi:cash-clock",
     ),
-    SensorEntityDescription(
-        key="ebay_fulfilled_orders",
-        name="eBay Fulfilled Orders",
-        icon="mdi:package-variant-closed-check",
+    EbaySensorEntityDescription(
+        key="ebay_revenue_1d",
+        name="Revenue 1 Day",
+        icon="mdi:cash-multiple",
+        device_class=SensorDeviceClass.MONETARY,
+        attributes_key="ebay_sales_1d_attributes",
+        unit_key="ebay_sales_currency",
     ),
-    SensorEntityDescription(
-        key="ebay_cancelled_orders",
-        name="eBay Cancelled Orders",
-        icon="mdi:package-variant-closed-remove",
+    EbaySensorEntityDescription(
+        key="ebay_units_sold_1d",
+        name="Units Sold 1 Day",
+        icon="mdi:package-variant",
     ),
-    SensorEntityDescription(
-        key="ebay_return_requests",
-        name="eBay Return Requests",
-        icon="mdi:clipboard-list",
+    EbaySensorEntityDescription(
+        key="ebay_orders_1d",
+        name="Orders 1 Day",
+        icon="mdi:cart-outline",
     ),
-    SensorEntityDescription(
-        key="ebay_cancellation_requests",
-        name="eBay Cancellation Requests",
-        icon="mdi:cancel",
+    EbaySensorEntityDescription(
+        key="ebay_average_order_value_1d",
+        name="Average Order Value 1 Day",
+        icon="mdi:cash",
+        device_class=SensorDeviceClass.MONETARY,
+        unit_key="ebay_sales_currency",
     ),
-    SensorEntityDescription(
-        key="ebay_active_listings",
-        name="eBay Active Listings",
-        icon="mdi:storefront-outline",
+    EbaySensorEntityDescription(
+        key="ebay_revenue_7d",
+        name="Revenue 7 Days",
+        icon="mdi:cash-multiple",
+        device_class=SensorDeviceClass.MONETARY,
+        attributes_key="ebay_sales_7d_attributes",
+        unit_key="ebay_sales_currency",
     ),
-    SensorEntityDescription(
-        key="ebay_listing_impressions",
-        name="eBay Listing Impressions",
-        icon="mdi:eye-outline",
+    EbaySensorEntityDescription(
+        key="ebay_units_sold_7d",
+        name="Units Sold 7 Days",
+        icon="mdi:package-variant",
     ),
-    SensorEntityDescription(
-        key="ebay_listing_page_views",
-        name="eBay Listing Page Views",
-        icon="mdi:eye",
+    EbaySensorEntityDescription(
+        key="ebay_orders_7d",
+        name="Orders 7 Days",
+        icon="mdi:cart-outline",
     ),
-    SensorEntityDescription(
-        key="ebay_click_through_rate",
-        name="eBay Click Through Rate",
-        icon="mdi:cursor-pointer",
-        native_unit_of_measurement="%",
+    EbaySensorEntityDescription(
+        key="ebay_average_order_value_7d",
+        name="Average Order Value 7 Days",
+        icon="mdi:cash",
+        device_class=SensorDeviceClass.MONETARY,
+        unit_key="ebay_sales_currency",
     ),
-    SensorEntityDescription(
-        key="ebay_orders_awaiting_payment",
-        name="eBay Orders Awaiting Payment",
-        icon="mdi:cash-clock",
+    EbaySensorEntityDescription(
+        key="ebay_revenue_30d",
+        name="Revenue 30 Days",
+        icon="mdi:cash-multiple",
+        device_class=SensorDeviceClass.MONETARY,
+        attributes_key="ebay_sales_30d_attributes",
+        unit_key="ebay_sales_currency",
+    ),
+    EbaySensorEntityDescription(
+        key="ebay_units_sold_30d",
+        name="Units Sold 30 Days",
+        icon="mdi:package-variant",
+    ),
+    EbaySensorEntityDescription(
+        key="ebay_orders_30d",
+        name="Orders 30 Days",
+        icon="mdi:cart-outline",
     ),
-    SensorEntityDescription(
+    EbaySensorEntityDescription(
+        key="ebay_average_order_value_30d",
+        name="Average Order Value 30 Days",
+        icon="mdi:cash",
+        device_class=SensorDeviceClass.MONETARY,
+        unit_key="ebay_sales_currency",
+    ),
+    EbaySensorEntityDescription(
         key="ebay_fulfilled_orders",
-        name="eBay Fulfilled Orders",
+        name="Fulfilled Orders",
         icon="mdi:package-variant-closed-check",
     ),
-    SensorEntityDescription(
+    EbaySensorEntityDescription(
         key="ebay_cancelled_orders",
-        name="eBay Cancelled Orders",
+        name="Cancelled Orders",
         icon="mdi:package-variant-closed-remove",
     ),
-    SensorEntityDescription(
+    EbaySensorEntityDescription(
         key="ebay_return_requests",
-        name="eBay Return Requests",
+        name="Return Requests",
         icon="mdi:clipboard-list",
     ),
-    SensorEntityDescription(
+    EbaySensorEntityDescription(
         key="ebay_cancellation_requests",
-        name="eBay Cancellation Requests",
+        name="Cancellation Requests",
         icon="mdi:cancel",
     ),
-    SensorEntityDescription(
+    EbaySensorEntityDescription(
         key="ebay_active_listings",
-        name="eBay Active Listings",
+        name="Active Listings",
         icon="mdi:storefront-outline",
     ),
-    SensorEntityDescription(
+    EbaySensorEntityDescription(
         key="ebay_listing_impressions",
-        name="eBay Listing Impressions",
+        name="Listing Impressions",
         icon="mdi:eye-outline",
+        attributes_key="ebay_listing_impressions_attributes",
     ),
-    SensorEntityDescription(
+    EbaySensorEntityDescription(
         key="ebay_listing_page_views",
-        name="eBay Listing Page Views",
+        name="Listing Page Views",
         icon="mdi:eye",
     ),
-    SensorEntityDescription(
+    EbaySensorEntityDescription(
+        key="ebay_listing_impressions_change",
+        name="Listing Impressions Change",
+        icon="mdi:trending-up",
+    ),
+    EbaySensorEntityDescription(
+        key="ebay_listing_page_views_change",
+        name="Listing Page Views Change",
+        icon="mdi:trending-up",
+    ),
+    EbaySensorEntityDescription(
         key="ebay_click_through_rate",
-        name="eBay Click Through Rate",
+        name="Click Through Rate",
         icon="mdi:cursor-pointer",
         native_unit_of_measurement="%",
+        attributes_key="ebay_click_through_rate_attributes",
     ),
 )
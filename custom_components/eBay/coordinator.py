@@ -0,0 +1,309 @@
+"""Per endpoint group update coordinators for the ebay integration."""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Collection
+from datetime import timedelta
+import logging
+from typing import TYPE_CHECKING, Any
+
+from aiohttp import ClientSession
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.exceptions import ConfigEntryAuthFailed
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+import homeassistant.util.dt as dt
+
+from .api import (
+    ENDPOINTS,
+    EbayApiClient,
+    EbayEndpoint,
+    EbayFetchError,
+    async_create_websession,
+    get_ebay_data,
+)
+from .cache import EbayResponseCache
+from .const import (
+    CONF_STALE_REFRESHES,
+    DATA_SCHEDULER,
+    DEFAULT_STALE_REFRESHES,
+    DEFAULT_MAX_CONCURRENCY,
+    DOMAIN,
+    GROUP_ORDERS,
+    REFRESH_BACKOFF_FACTOR,
+    REFRESH_INTERVALS,
+    STAGGER_RATIO,
+    WEBHOOK_RECONCILE_INTERVAL,
+)
+
+if TYPE_CHECKING:
+    from .api import ConfigEntryAuth
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class EbayGroupCoordinator(DataUpdateCoordinator[dict[str, Any]]):
+    """Refresh one group of eBay endpoints on its own adaptive interval.
+
+    The group starts at its fastest interval. Every refresh that returns the
+    same values as the previous one stretches the interval by
+    ``REFRESH_BACKOFF_FACTOR`` up to the slowest interval, and any change
+    snaps it back to the fastest one.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        api: ConfigEntryAuth,
+        group: str,
+        endpoints: tuple[EbayEndpoint, ...],
+    ) -> None:
+        """Initialize the coordinator for one endpoint group."""
+        self.api = api
+        self.group = group
+        self.endpoints = endpoints
+        self._key_endpoints = {
+            key: endpoint.name for endpoint in endpoints for key in endpoint.keys
+        }
+        # Data keys read by the entities added to Home Assistant, with counts
+        self._used_keys: dict[str, int] = {}
+        self.min_interval, self.max_interval = REFRESH_INTERVALS[group]
+        super().__init__(
+            hass,
+            _LOGGER,
+            name=f"ebay {group}",
+            update_interval=self.min_interval,
+        )
+
+    def cached_data(self) -> dict[str, Any] | None:
+        """Return the cached values of the group's cached endpoints, if any.
+
+        Endpoints whose sensors are all disabled are never fetched, so they
+        are never cached either and don't keep the group from starting warm.
+        Fetch times count as the endpoints' last successes, so sensors
+        restored from an old cache still go stale on time.
+        """
+        if (cache := self.api.client.cache) is None:
+            return None
+        data: dict[str, Any] | None = None
+        for endpoint in self.endpoints:
+            if (entry := cache.get(endpoint.name)) is None:
+                continue
+            self.api.client.breaker.record_success(endpoint.name, entry.fetched)
+            data = {**(data or {}), **entry.data}
+        return data
+
+    def has_planned_data(self) -> bool:
+        """Return True if every endpoint in the fetch plan has succeeded."""
+        breaker = self.api.client.breaker
+        return all(
+            breaker.last_success(endpoint.name) is not None
+            for endpoint in self.fetch_plan()
+        )
+
+    def provides(self, key: str) -> bool:
+        """Return True if one of the group's endpoints produces a key."""
+        return key in self._key_endpoints
+
+    @callback
+    def async_use_key(self, key: str) -> CALLBACK_TYPE:
+        """Mark a data key as read by an entity until the callback is called.
+
+        Entities disabled in the entity registry are never added, so they
+        never mark their key and their endpoints drop out of the fetch plan.
+        """
+        self._used_keys[key] = self._used_keys.get(key, 0) + 1
+
+        @callback
+        def _release() -> None:
+            if (count := self._used_keys[key] - 1) > 0:
+                self._used_keys[key] = count
+            else:
+                del self._used_keys[key]
+
+        return _release
+
+    def fetch_plan(self) -> tuple[EbayEndpoint, ...]:
+        """Return the endpoints feeding at least one added entity."""
+        return tuple(
+            endpoint
+            for endpoint in self.endpoints
+            if any(key in self._used_keys for key in endpoint.keys)
+        )
+
+    @property
+    def stale_after(self) -> timedelta:
+        """Return the age after which an endpoint's values are stale.
+
+        Once the webhook has delivered notifications, orders may only be
+        polled every ``WEBHOOK_RECONCILE_INTERVAL``, so that is their slowest
+        refresh.
+        """
+        options = self.config_entry.options if self.config_entry else {}
+        missed = options.get(CONF_STALE_REFRESHES, DEFAULT_STALE_REFRESHES)
+        interval = self.max_interval
+        webhook = self.api.webhook
+        if (
+            self.group == GROUP_ORDERS
+            and webhook is not None
+            and webhook.last_received is not None
+        ):
+            interval = max(interval, WEBHOOK_RECONCILE_INTERVAL)
+        return interval * missed
+
+    def is_fresh(self, key: str) -> bool:
+        """Return True if the endpoint behind a key succeeded recently enough."""
+        if (name := self._key_endpoints.get(key)) is None:
+            return True
+        last_success = self.api.client.breaker.last_success(name)
+        return (
+            last_success is not None and dt.utcnow() - last_success <= self.stale_after
+        )
+
+    async def _async_update_data(self) -> dict[str, Any]:
+        """Fetch the endpoints of this group.
+
+        Endpoints that fail keep their last values, so once the group has data
+        a refresh only fails as a whole when no token can be had; sensors of
+        failing endpoints turn unavailable on their own once stale.
+        """
+        if not (endpoints := self.fetch_plan()):
+            # No entity reads this group, so poll nothing and back off
+            data = self.data or {}
+            self._adapt_interval(data)
+            return data
+        try:
+            access_token = await self.api.token_manager.async_get_access_token()
+            fetched = await get_ebay_data(
+                access_token, endpoints, client=self.api.client
+            )
+        except ConfigEntryAuthFailed:
+            raise
+        except EbayFetchError as ex:
+            if self.data is None:
+                raise UpdateFailed(f"Error getting Ebay data: {ex}") from ex
+            _LOGGER.warning("%s, keeping the last values", ex)
+            return self.data
+        except Exception as ex:
+            raise UpdateFailed(f"Error getting Ebay data: {ex}") from ex
+        # Endpoints deferred by the rate-limit governor keep their last values
+        data = {**(self.data or {}), **fetched}
+        self._adapt_interval(
+            data,
+            complete=all(
+                set(endpoint.keys) <= fetched.keys() for endpoint in endpoints
+            ),
+        )
+        return data
+
+    @callback
+    def async_push_update(self, values: dict[str, Any]) -> None:
+        """Apply values pushed by the webhook without polling eBay."""
+        client = self.api.client
+        for endpoint in self.endpoints:
+            if not set(endpoint.keys) <= values.keys():
+                continue
+            client.breaker.record_success(endpoint.name, dt.utcnow())
+            if client.cache is not None:
+                client.cache.set(
+                    endpoint.name, {key: values[key] for key in endpoint.keys}
+                )
+        self.async_set_updated_data({**(self.data or {}), **values})
+
+    def _adapt_interval(self, data: dict[str, Any], complete: bool = True) -> None:
+        """Back off while results are unchanged, tighten when they change.
+
+        Only a ``complete`` refresh, where every planned endpoint succeeded,
+        backs off; after failed, paused or deferred endpoints the interval is
+        kept, since their unchanged values say nothing.
+
+        While the webhook delivers notifications, polling orders only
+        reconciles missed events, so their interval never drops below
+        ``WEBHOOK_RECONCILE_INTERVAL``.
+        """
+        if self.data is None or data != self.data:
+            interval = self.min_interval
+        elif complete:
+            interval = min(
+                self.update_interval * REFRESH_BACKOFF_FACTOR, self.max_interval
+            )
+        else:
+            interval = self.update_interval
+        webhook = self.api.webhook
+        if (
+            self.group == GROUP_ORDERS
+            and webhook is not None
+            and webhook.is_healthy(dt.utcnow())
+        ):
+            interval = max(interval, WEBHOOK_RECONCILE_INTERVAL)
+        if interval != self.update_interval:
+            _LOGGER.debug("eBay %s refresh interval is now %s", self.group, interval)
+        self.update_interval = interval
+
+
+def async_create_coordinators(
+    hass: HomeAssistant, api: ConfigEntryAuth, enabled: Collection[str] | None = None
+) -> dict[str, EbayGroupCoordinator]:
+    """Create one coordinator per endpoint group over the enabled endpoints.
+
+    Every group gets a coordinator, even with no endpoint enabled.
+    """
+    groups: dict[str, list[EbayEndpoint]] = {group: [] for group in REFRESH_INTERVALS}
+    for endpoint in ENDPOINTS:
+        if enabled is None or endpoint.name in enabled:
+            groups[endpoint.group].append(endpoint)
+    return {
+        group: EbayGroupCoordinator(hass, api, group, tuple(endpoints))
+        for group, endpoints in groups.items()
+    }
+
+
+class EbayScheduler:
+    """Share one HTTP pool and request budget across every eBay account.
+
+    Each account gets its own client, but they all draw from the same pooled
+    session and concurrency cap. Accounts are also given staggered start
+    offsets so their group refreshes interleave instead of firing together.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the scheduler with no accounts."""
+        self.websession: ClientSession | None = None
+        self.semaphore = asyncio.Semaphore(DEFAULT_MAX_CONCURRENCY)
+        self._slots: dict[str, int] = {}
+
+    def async_create_client(
+        self, entry_id: str, cache: EbayResponseCache
+    ) -> EbayApiClient:
+        """Register an account and return its client on the shared pool."""
+        if self.websession is None:
+            self.websession = async_create_websession()
+        self._slots[entry_id] = next(
+            slot
+            for slot in range(len(self._slots) + 1)
+            if slot not in self._slots.values()
+        )
+        return EbayApiClient(self.websession, semaphore=self.semaphore, cache=cache)
+
+    def stagger(self, entry_id: str, interval: timedelta) -> float:
+        """Return the start offset in seconds of an account within interval.
+
+        Slots are spread by the golden ratio, so any number of accounts end up
+        roughly evenly spaced without knowing how many there will be.
+        """
+        return (self._slots[entry_id] * STAGGER_RATIO) % 1 * interval.total_seconds()
+
+    async def async_release(self, entry_id: str) -> None:
+        """Unregister an account, closing the pool after the last one."""
+        self._slots.pop(entry_id, None)
+        if not self._slots and self.websession is not None:
+            await self.websession.close()
+            self.websession = None
+
+
+@callback
+def async_get_scheduler(hass: HomeAssistant) -> EbayScheduler:
+    """Return the scheduler shared by every config entry."""
+    if (scheduler := hass.data[DOMAIN].get(DATA_SCHEDULER)) is None:
+        scheduler = hass.data[DOMAIN][DATA_SCHEDULER] = EbayScheduler()
+    return scheduler
@@ -0,0 +1,32 @@
+"""JSON decoding of eBay responses for the ebay integration."""
+from __future__ import annotations
+
+import asyncio
+import json
+from typing import Any
+
+from .const import JSON_EXECUTOR_THRESHOLD
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def json_loads(body: bytes) -> Any:
+    """Decode a JSON body with orjson when installed, else the stdlib."""
+    if orjson is not None:
+        return orjson.loads(body)
+    return json.loads(body)
+
+
+async def async_json_loads(body: bytes) -> Any:
+    """Decode a JSON body, in the executor once it is large.
+
+    Decoding a multi-megabyte order or traffic page takes long enough to
+    stall the event loop, so bodies of ``JSON_EXECUTOR_THRESHOLD`` bytes or
+    more are handed to a worker thread.
+    """
+    if len(body) < JSON_EXECUTOR_THRESHOLD:
+        return json_loads(body)
+    return await asyncio.get_running_loop().run_in_executor(None, json_loads, body)
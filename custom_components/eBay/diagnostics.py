@@ -0,0 +1,85 @@
+"""Diagnostics support for the ebay integration."""
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .api import ConfigEntryAuth
+from .const import CONF_USER_ID, CONF_VERIFICATION_TOKEN, CONF_WEBHOOK_ID, DOMAIN
+from .webhook import EbayWebhook
+
+# The eBay user id is also the entry's unique id
+TO_REDACT = {
+    "token",
+    CONF_USER_ID,
+    "unique_id",
+    CONF_VERIFICATION_TOKEN,
+    CONF_WEBHOOK_ID,
+}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return refresh metrics and request state of a config entry."""
+    auth: ConfigEntryAuth = hass.data[DOMAIN][entry.entry_id]
+    client = auth.client
+    governor = client.governor
+    webhook = auth.webhook
+    return {
+        "entry": async_redact_data(entry.as_dict(), TO_REDACT),
+        "coordinators": {
+            group: {
+                "update_interval": str(coordinator.update_interval),
+                "last_update_success": coordinator.last_update_success,
+                "last_exception": repr(coordinator.last_exception),
+            }
+            for group, coordinator in auth.coordinators.items()
+        },
+        "endpoints": client.metrics.as_dict(),
+        "endpoint_health": client.breaker.as_dict(),
+        "governor": {
+            "calls": dict(governor.calls),
+            "rate_limited": governor.rate_limited,
+            "deferred": governor.deferred,
+            "quotas": {
+                api: {
+                    "limit": quota.limit,
+                    "remaining": governor.remaining(api),
+                    "reset": quota.reset.isoformat() if quota.reset else None,
+                }
+                for api, quota in governor.quotas.items()
+            },
+        },
+        "cache_hits": client.cache.hits if client.cache else None,
+        "token": {
+            "refreshes": auth.token_manager.refreshes,
+            "failures": auth.token_manager.failures,
+        },
+        "webhook": _webhook_diagnostics(webhook) if webhook else None,
+        "fulfillment": auth.fulfillment.as_dict() if auth.fulfillment else None,
+        "orders": len(client.order_sync.orders),
+        "sales_orders": len(client.sales),
+        "listings": len(client.traffic),
+        "inventory": {
+            "skus": len(client.inventory),
+            "total": client.inventory.total,
+            "passes": client.inventory.passes,
+            "offset": client.inventory.offset,
+            "low_stock": len(client.inventory.low),
+        },
+    }
+
+
+def _webhook_diagnostics(webhook: EbayWebhook) -> dict[str, Any]:
+    """Return the notification counters of the webhook."""
+    return {
+        "received": webhook.received,
+        "rejected": webhook.rejected,
+        "last_received": (
+            webhook.last_received.isoformat() if webhook.last_received else None
+        ),
+    }
@@ -0,0 +1,44 @@
+"""Base entity for the ebay integration."""
+from __future__ import annotations
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.helpers.device_registry import DeviceEntryType, DeviceInfo
+from homeassistant.helpers.entity import EntityDescription
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+
+from .const import DOMAIN
+from .coordinator import EbayGroupCoordinator
+
+
+class EbayEntity(CoordinatorEntity[EbayGroupCoordinator]):
+    """An entity of one eBay account, grouped under that account's device."""
+
+    _attr_has_entity_name = True
+
+    def __init__(
+        self,
+        coordinator: EbayGroupCoordinator,
+        description: EntityDescription,
+        entry: ConfigEntry,
+    ) -> None:
+        """Pass coordinator to CoordinatorEntity."""
+        super().__init__(coordinator)
+        self.entity_description = description
+        self._attr_unique_id = f"{entry.entry_id}_{description.key}"
+        self._attr_device_info = DeviceInfo(
+            identifiers={(DOMAIN, entry.entry_id)},
+            name=entry.title,
+            manufacturer="eBay",
+            entry_type=DeviceEntryType.SERVICE,
+        )
+
+    @property
+    def data_key(self) -> str | None:
+        """Return the coordinator data key the entity reads, if any."""
+        return self.entity_description.key
+
+    async def async_added_to_hass(self) -> None:
+        """Tell the coordinator its data key is in use."""
+        await super().async_added_to_hass()
+        if (key := self.data_key) is not None:
+            self.async_on_remove(self.coordinator.async_use_key(key))
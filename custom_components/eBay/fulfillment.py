@@ -0,0 +1,294 @@
+"""Queued shipping fulfillment writes for the ebay integration."""
+from __future__ import annotations
+
+import asyncio
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+import logging
+from typing import Any
+
+from aiohttp import ClientError, ClientResponseError
+from aiohttp.hdrs import METH_POST
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import HomeAssistantError
+import homeassistant.util.dt as dt
+
+from .api import ConfigEntryAuth, merge_orders
+from .const import (
+    DEFAULT_ENDPOINT_TIMEOUT,
+    EVENT_FULFILLMENT_RESULT,
+    GROUP_ORDERS,
+    ORDER_URL,
+    SHIPPING_FULFILLMENT_URL,
+    WRITE_BATCH_SIZE,
+    WRITE_DEDUPE_SIZE,
+    WRITE_MAX_ATTEMPTS,
+    WRITE_RETRY_DELAY,
+)
+from .models import EbayOrder
+
+_LOGGER = logging.getLogger(__name__)
+
+RESULT_SHIPPED = "shipped"
+RESULT_DUPLICATE = "duplicate"
+RESULT_FAILED = "failed"
+
+
+@dataclass(frozen=True, slots=True)
+class ShipmentRequest:
+    """One shipment to report: an order, its tracking and optional line items."""
+
+    order_id: str
+    tracking_number: str
+    carrier: str
+    line_items: tuple[tuple[str, int | None], ...] | None = None
+    shipped_date: datetime | None = None
+
+    @property
+    def key(self) -> tuple[str, str]:
+        """Return what identifies a repeated call for the same shipment."""
+        return self.order_id, self.tracking_number.upper()
+
+
+class EbayFulfillmentQueue:
+    """Send shipping fulfillments to eBay from a queue, in batches.
+
+    Services only enqueue and return. A single worker takes up to
+    ``WRITE_BATCH_SIZE`` shipments at a time and sends them through the
+    client, so they share its connection cap and the rate-limit governor with
+    the polling. A shipment already queued or shipped by this run is dropped
+    as a duplicate. Transport errors are retried; before a retry the order's
+    fulfillments are checked for the tracking number, so a request that
+    reached eBay is not sent twice. Every shipment ends with an
+    ``ebay_fulfillment_result`` event.
+    """
+
+    def __init__(
+        self, hass: HomeAssistant, entry: ConfigEntry, auth: ConfigEntryAuth
+    ) -> None:
+        """Initialize an empty queue for a config entry."""
+        self.hass = hass
+        self.entry = entry
+        self.auth = auth
+        self._queue: asyncio.Queue[ShipmentRequest] = asyncio.Queue()
+        self._pending: set[tuple[str, str]] = set()
+        self._done: OrderedDict[tuple[str, str], str | None] = OrderedDict()
+        self.shipped = 0
+        self.failed = 0
+
+    def __len__(self) -> int:
+        """Return the number of shipments waiting to be sent."""
+        return self._queue.qsize()
+
+    def submit(self, shipments: list[ShipmentRequest]) -> int:
+        """Queue shipments, dropping duplicates, and return how many were queued.
+
+        Nothing is queued while eBay refuses the account's refresh token.
+        """
+        if self.auth.token_manager.auth_failed:
+            raise HomeAssistantError(
+                f"eBay account {self.entry.title} must be re-authenticated"
+                " before it can ship orders"
+            )
+        queued = 0
+        for shipment in shipments:
+            key = shipment.key
+            if key in self._pending or key in self._done:
+                self._fire(
+                    shipment, RESULT_DUPLICATE, fulfillment_id=self._done.get(key)
+                )
+                continue
+            self._pending.add(key)
+            self._queue.put_nowait(shipment)
+            queued += 1
+        return queued
+
+    async def async_run(self) -> None:
+        """Send queued shipments in batches until the entry is unloaded.
+
+        Every failure is reported per shipment, so the worker never stops.
+        """
+        while True:
+            batch = [await self._queue.get()]
+            while len(batch) < WRITE_BATCH_SIZE and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            shipped = await asyncio.gather(
+                *(self._async_ship(shipment) for shipment in batch)
+            )
+            try:
+                await self._async_refresh_orders(
+                    [shipment.order_id for shipment, ok in zip(batch, shipped) if ok]
+                )
+            except Exception:
+                _LOGGER.exception("Error updating shipped eBay orders")
+
+    async def _async_ship(self, shipment: ShipmentRequest) -> bool:
+        """Send one shipment, retrying transport errors, and report the result."""
+        key = shipment.key
+        error: str | None = None
+        fulfillment_id: str | None = None
+        shipped = False
+        try:
+            for attempt in range(1, WRITE_MAX_ATTEMPTS + 1):
+                try:
+                    if attempt > 1:
+                        fulfillment_id = await self._async_find_existing(shipment)
+                    if fulfillment_id is None:
+                        fulfillment_id = await self._async_create(shipment)
+                    shipped = True
+                    break
+                except ClientResponseError as ex:
+                    if ex.status != 429 and 400 <= ex.status < 500:
+                        error = f"{ex.status} {ex.message}"
+                        break
+                    error = repr(ex)
+                except (ClientError, TimeoutError) as ex:
+                    error = repr(ex)
+                except (KeyError, ValueError) as ex:
+                    # Unknown line items, or an order with nothing to ship
+                    error = repr(ex)
+                    break
+                except HomeAssistantError as ex:
+                    # No token: the account needs re-authentication
+                    error = str(ex) or repr(ex)
+                    break
+                except Exception as ex:
+                    _LOGGER.exception(
+                        "Unexpected error shipping eBay order %s", shipment.order_id
+                    )
+                    error = repr(ex)
+                    break
+                if attempt < WRITE_MAX_ATTEMPTS:
+                    await asyncio.sleep(WRITE_RETRY_DELAY * attempt)
+        finally:
+            self._pending.discard(key)
+
+        if not shipped:
+            self.failed += 1
+            _LOGGER.warning(
+                "Unable to ship eBay order %s: %s", shipment.order_id, error
+            )
+            self._fire(shipment, RESULT_FAILED, error=error)
+            return False
+        self.shipped += 1
+        self._done[key] = fulfillment_id
+        if len(self._done) > WRITE_DEDUPE_SIZE:
+            self._done.popitem(last=False)
+        self._fire(shipment, RESULT_SHIPPED, fulfillment_id=fulfillment_id)
+        return True
+
+    async def _async_create(self, shipment: ShipmentRequest) -> str | None:
+        """Create a shipping fulfillment and return its id."""
+        line_items = await self._async_line_items(shipment)
+        shipped = shipment.shipped_date or dt.utcnow()
+        response = await self.auth.client.async_request(
+            METH_POST,
+            SHIPPING_FULFILLMENT_URL.format(order_id=shipment.order_id),
+            await self.auth.token_manager.async_get_access_token(),
+            DEFAULT_ENDPOINT_TIMEOUT,
+            payload={
+                "lineItems": [
+                    {"lineItemId": line_item_id, "quantity": quantity}
+                    for line_item_id, quantity in line_items
+                ],
+                "shippedDate": dt.as_utc(shipped).strftime("%Y-%m-%dT%H:%M:%S.000Z"),
+                "shippingCarrierCode": shipment.carrier,
+                "trackingNumber": shipment.tracking_number,
+            },
+        )
+        # eBay answers 201 with the new fulfillment's URL and no body
+        location = (response.location or "").rstrip("/")
+        return location.rpartition("/")[2] or None
+
+    async def _async_line_items(
+        self, shipment: ShipmentRequest
+    ) -> list[tuple[str, int]]:
+        """Return the line item ids and quantities a shipment covers."""
+        order = self.auth.client.order_sync.orders.get(shipment.order_id)
+        if order is None:
+            order = EbayOrder.from_api(
+                await self.auth.client.async_get_json(
+                    ORDER_URL.format(order_id=shipment.order_id),
+                    await self.auth.token_manager.async_get_access_token(),
+                    DEFAULT_ENDPOINT_TIMEOUT,
+                )
+            )
+        quantities = {item.line_item_id: item.quantity for item in order.line_items}
+        if shipment.line_items is None:
+            if not quantities:
+                raise ValueError("order has no line items")
+            return list(quantities.items())
+        return [
+            (line_item_id, quantity or quantities[line_item_id])
+            for line_item_id, quantity in shipment.line_items
+        ]
+
+    async def _async_find_existing(self, shipment: ShipmentRequest) -> str | None:
+        """Return the id of a fulfillment of the order with the same tracking."""
+        data = await self.auth.client.async_get_json(
+            SHIPPING_FULFILLMENT_URL.format(order_id=shipment.order_id),
+            await self.auth.token_manager.async_get_access_token(),
+            DEFAULT_ENDPOINT_TIMEOUT,
+        )
+        tracking_number = shipment.tracking_number.upper()
+        for fulfillment in data.get("fulfillments", []):
+            if str(fulfillment.get("shipmentTrackingNumber", "")).upper() == (
+                tracking_number
+            ):
+                return fulfillment.get("fulfillmentId")
+        return None
+
+    async def _async_refresh_orders(self, order_ids: list[str]) -> None:
+        """Re-read shipped orders and push the new order and sales values."""
+        if not order_ids:
+            return
+        orders: list[EbayOrder] = []
+        for order_id in dict.fromkeys(order_ids):
+            try:
+                data = await self.auth.client.async_get_json(
+                    ORDER_URL.format(order_id=order_id),
+                    await self.auth.token_manager.async_get_access_token(),
+                    DEFAULT_ENDPOINT_TIMEOUT,
+                )
+                orders.append(EbayOrder.from_api(data))
+            except Exception as ex:
+                _LOGGER.debug(
+                    "Error re-reading shipped eBay order %s: %r", order_id, ex
+                )
+        values = merge_orders(self.auth.client, orders)
+        coordinator = self.auth.coordinators.get(GROUP_ORDERS)
+        if values and coordinator is not None:
+            coordinator.async_push_update(values)
+
+    def _fire(
+        self,
+        shipment: ShipmentRequest,
+        result: str,
+        *,
+        fulfillment_id: str | None = None,
+        error: str | None = None,
+    ) -> None:
+        """Report the outcome of one shipment as an event."""
+        self.hass.bus.async_fire(
+            EVENT_FULFILLMENT_RESULT,
+            {
+                "config_entry_id": self.entry.entry_id,
+                "order_id": shipment.order_id,
+                "tracking_number": shipment.tracking_number,
+                "result": result,
+                "fulfillment_id": fulfillment_id,
+                "error": error,
+            },
+        )
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the queue state for diagnostics."""
+        return {
+            "queued": len(self),
+            "in_flight": len(self._pending) - len(self),
+            "shipped": self.shipped,
+            "failed": self.failed,
+        }
@@ -0,0 +1,102 @@
+"""Per-endpoint health and circuit breaking for the ebay integration."""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime
+import logging
+from typing import Any
+
+from .const import BREAKER_COOLDOWN, BREAKER_FAILURE_THRESHOLD, BREAKER_MAX_COOLDOWN
+
+_LOGGER = logging.getLogger(__name__)
+
+
+@dataclass(slots=True)
+class EndpointHealth:
+    """When an endpoint last succeeded and how it has failed since."""
+
+    last_success: datetime | None = None
+    failures: int = 0
+    open_until: datetime | None = None
+    last_error: str | None = None
+
+
+class EbayCircuitBreaker:
+    """Stop requesting endpoints that keep failing, for a growing cooldown.
+
+    After ``BREAKER_FAILURE_THRESHOLD`` consecutive failures an endpoint is
+    skipped for ``BREAKER_COOLDOWN``, doubling with every further failure up
+    to ``BREAKER_MAX_COOLDOWN``. Once the cooldown ends a single attempt is
+    let through; success closes the breaker, failure reopens it.
+    """
+
+    def __init__(self) -> None:
+        """Initialize with every endpoint closed."""
+        self.endpoints: dict[str, EndpointHealth] = {}
+
+    def get(self, name: str) -> EndpointHealth:
+        """Return the health of an endpoint, creating it if needed."""
+        if (health := self.endpoints.get(name)) is None:
+            health = self.endpoints[name] = EndpointHealth()
+        return health
+
+    def last_success(self, name: str) -> datetime | None:
+        """Return when the data of an endpoint was last fetched."""
+        if (health := self.endpoints.get(name)) is None:
+            return None
+        return health.last_success
+
+    def is_open(self, name: str, now: datetime) -> bool:
+        """Return True if an endpoint should not be requested now."""
+        health = self.endpoints.get(name)
+        return (
+            health is not None
+            and health.open_until is not None
+            and now < health.open_until
+        )
+
+    def record_success(self, name: str, fetched: datetime) -> None:
+        """Close the breaker of an endpoint whose data is from ``fetched``."""
+        health = self.get(name)
+        if health.open_until is not None:
+            _LOGGER.info("eBay %s recovered", name)
+        if health.last_success is None or fetched > health.last_success:
+            health.last_success = fetched
+        health.failures = 0
+        health.open_until = None
+        health.last_error = None
+
+    def record_failure(self, name: str, error: Exception, now: datetime) -> None:
+        """Count a failure, opening the breaker past the threshold."""
+        health = self.get(name)
+        health.failures += 1
+        health.last_error = repr(error)
+        if health.failures < BREAKER_FAILURE_THRESHOLD:
+            return
+        cooldown = min(
+            BREAKER_COOLDOWN * 2 ** (health.failures - BREAKER_FAILURE_THRESHOLD),
+            BREAKER_MAX_COOLDOWN,
+        )
+        health.open_until = now + cooldown
+        _LOGGER.warning(
+            "eBay %s failed %s times in a row, pausing it for %s",
+            name,
+            health.failures,
+            cooldown,
+        )
+
+    def as_dict(self) -> dict[str, dict[str, Any]]:
+        """Return the health of every endpoint for diagnostics."""
+        return {
+            name: {
+                "last_success": (
+                    health.last_success.isoformat() if health.last_success else None
+                ),
+                "failures": health.failures,
+                "open_until": (
+                    health.open_until.isoformat() if health.open_until else None
+                ),
+                "last_error": health.last_error,
+            }
+            for name, health in self.endpoints.items()
+        }
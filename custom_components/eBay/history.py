@@ -0,0 +1,196 @@
+"""Compact long-range metric history for the ebay integration."""
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from datetime import datetime
+import logging
+from typing import Any
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+from homeassistant.util import slugify
+import homeassistant.util.dt as dt
+
+from .const import (
+    CONF_STATISTICS_ID,
+    DOMAIN,
+    EBAY_QUERIES_SENSOR,
+    HISTORY_DAILY_RETENTION,
+    HISTORY_HOURLY_RETENTION,
+    HISTORY_METRICS,
+    HISTORY_SAVE_DELAY,
+    HISTORY_STORAGE_VERSION,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+# A closed rollup row: period start (epoch seconds), mean, min, max
+Row = list[float]
+
+
+@dataclass(slots=True)
+class _Rollup:
+    """Running min, max, sum and count per metric of an open period."""
+
+    start: int
+    values: dict[str, list[float]] = field(default_factory=dict)
+
+    def add(self, metric: str, value: float) -> None:
+        """Fold a sample into the period."""
+        if (stats := self.values.get(metric)) is None:
+            self.values[metric] = [value, value, value, 1]
+            return
+        stats[0] = min(stats[0], value)
+        stats[1] = max(stats[1], value)
+        stats[2] += value
+        stats[3] += 1
+
+    def rows(self) -> dict[str, Row]:
+        """Return the closed row of every metric."""
+        return {
+            metric: [self.start, round(total / count, 3), low, high]
+            for metric, (low, high, total, count) in self.values.items()
+        }
+
+
+class EbayHistory:
+    """Hourly and daily rollups of the main sensors, kept outside the recorder.
+
+    Samples are folded into the open hour and day as they arrive. Closed
+    periods are appended to per-metric series as ``[start, mean, min, max]``
+    rows, trimmed to their retention, and every closed hour is imported into
+    the recorder as external long-term statistics (``ebay:<account>_<metric>``)
+    so long-range graphs don't depend on the sensors' state history.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry: ConfigEntry) -> None:
+        """Initialize an empty history for a config entry."""
+        self.hass = hass
+        self._store: Store[dict[str, Any]] = Store(
+            hass, HISTORY_STORAGE_VERSION, f"{DOMAIN}.{entry.entry_id}.history"
+        )
+        self._account = entry.data.get(CONF_STATISTICS_ID) or slugify(
+            entry.unique_id or entry.title
+        )
+        self._title = entry.title
+        self.hourly: dict[str, list[Row]] = {}
+        self.daily: dict[str, list[Row]] = {}
+        self._hour: _Rollup | None = None
+        self._day: _Rollup | None = None
+
+    async def async_load(self) -> None:
+        """Load the history saved by a previous run."""
+        if (stored := await self._store.async_load()) is None:
+            return
+        self.hourly = stored["hourly"]
+        self.daily = stored["daily"]
+        if (hour := stored.get("hour")) is not None:
+            self._hour = _Rollup(hour["start"], hour["values"])
+        if (day := stored.get("day")) is not None:
+            self._day = _Rollup(day["start"], day["values"])
+
+    async def async_remove(self) -> None:
+        """Delete the stored history when the config entry is removed."""
+        await self._store.async_remove()
+
+    @callback
+    def record(self, data: dict[str, Any], now: datetime | None = None) -> None:
+        """Fold the current sensor values into the open hour and day."""
+        now = now or dt.utcnow()
+        hour = int(now.timestamp()) // 3600 * 3600
+        day = int(dt.start_of_local_day(dt.as_local(now)).timestamp())
+        if self._hour is not None and self._hour.start != hour:
+            closed = self._append(self.hourly, self._hour)
+            self._import(closed)
+            self._hour = None
+        if self._day is not None and self._day.start != day:
+            self._append(self.daily, self._day)
+            self._day = None
+        if self._hour is None:
+            self._hour = _Rollup(hour)
+        if self._day is None:
+            self._day = _Rollup(day)
+
+        for metric in HISTORY_METRICS:
+            value = data.get(metric)
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                self._hour.add(metric, value)
+                self._day.add(metric, value)
+        self._trim(now)
+        self._store.async_delay_save(self._data_to_save, HISTORY_SAVE_DELAY)
+
+    @staticmethod
+    def _append(series: dict[str, list[Row]], rollup: _Rollup) -> dict[str, Row]:
+        """Close a period onto its series and return the new rows."""
+        rows = rollup.rows()
+        for metric, row in rows.items():
+            series.setdefault(metric, []).append(row)
+        return rows
+
+    def _trim(self, now: datetime) -> None:
+        """Drop rows older than the retention of their resolution."""
+        for series, retention in (
+            (self.hourly, HISTORY_HOURLY_RETENTION),
+            (self.daily, HISTORY_DAILY_RETENTION),
+        ):
+            cutoff = (now - retention).timestamp()
+            for rows in series.values():
+                # Rows are appended in time order, so only the head expires
+                expired = 0
+                while expired < len(rows) and rows[expired][0] < cutoff:
+                    expired += 1
+                del rows[:expired]
+
+    def _import(self, rows: dict[str, Row]) -> None:
+        """Add closed hours to the recorder's long-term statistics."""
+        if "recorder" not in self.hass.config.components:
+            return
+        # The recorder is optional, so it is only imported once it is loaded
+        from homeassistant.components.recorder.models import (
+            StatisticData,
+            StatisticMetaData,
+        )
+        from homeassistant.components.recorder.statistics import (
+            async_add_external_statistics,
+        )
+
+        descriptions = {
+            description.key: description for description in EBAY_QUERIES_SENSOR
+        }
+        for metric, (start, mean, low, high) in rows.items():
+            description = descriptions.get(metric)
+            metadata = StatisticMetaData(
+                has_mean=True,
+                has_sum=False,
+                name=f"{self._title} {description.name if description else metric}",
+                source=DOMAIN,
+                statistic_id=(
+                    f"{DOMAIN}:{self._account}_{metric.removeprefix('ebay_')}"
+                ),
+                unit_of_measurement=(
+                    description.native_unit_of_measurement if description else None
+                ),
+            )
+            statistic = StatisticData(
+                start=dt.utc_from_timestamp(start), mean=mean, min=low, max=high
+            )
+            async_add_external_statistics(self.hass, metadata, [statistic])
+        _LOGGER.debug("Imported an hour of %s eBay statistics", len(rows))
+
+    def _data_to_save(self) -> dict[str, Any]:
+        """Return the history in its stored form."""
+        return {
+            "hourly": self.hourly,
+            "daily": self.daily,
+            "hour": (
+                {"start": self._hour.start, "values": self._hour.values}
+                if self._hour
+                else None
+            ),
+            "day": (
+                {"start": self._day.start, "values": self._day.values}
+                if self._day
+                else None
+            ),
+        }
@@ -0,0 +1,274 @@
+"""SKU-keyed inventory index for the ebay integration."""
+from __future__ import annotations
+
+from array import array
+import asyncio
+from collections.abc import Iterable
+from contextlib import aclosing
+from datetime import datetime
+import heapq
+import logging
+from typing import TYPE_CHECKING, Any
+
+from aiohttp.hdrs import METH_POST
+
+import homeassistant.util.dt as dt
+
+from .const import (
+    BULK_GET_INVENTORY_URL,
+    DEFAULT_LOW_STOCK_THRESHOLD,
+    INVENTORY_BULK_LIMIT,
+    INVENTORY_PAGE_LIMIT,
+    INVENTORY_PAGE_WINDOW,
+    INVENTORY_PAGES_PER_REFRESH,
+    INVENTORY_URL,
+    LOW_STOCK_LISTED,
+    ORDER_SYNC_OVERLAP,
+)
+
+if TYPE_CHECKING:
+    from .api import EbayApiClient
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def _quantity(item: dict[str, Any]) -> int:
+    """Return the quantity available to ship of an inventory item."""
+    availability = item.get("availability", {}).get("shipToLocationAvailability", {})
+    return int(availability.get("quantity", 0))
+
+
+class EbayInventoryIndex:
+    """Available quantity per SKU, kept current without re-reading the catalog.
+
+    Every SKU owns a row: its index in ``skus`` and ``_rows`` and its quantity
+    at the same index of the ``quantities`` column, so lookups are a dict hit.
+    The first sync walks the whole catalog. After that each sync reads the
+    next ``INVENTORY_PAGES_PER_REFRESH`` pages of a rolling walk, wrapping at
+    the end, and re-reads the SKUs of orders created since the previous sync
+    with bulk requests, since those are the quantities that just dropped.
+    SKUs missing from two passes in a row are dropped.
+
+    SKUs at or below their threshold are kept in ``low``; a known SKU
+    crossing its threshold either way is queued in ``crossings``.
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty index."""
+        self.skus: list[str] = []
+        self._rows: dict[str, int] = {}
+        self.quantities = array("q")
+        # Pass of the rolling walk in which each row was last listed
+        self._seen = array("L")
+        self.passes = 0
+        self.offset = 0
+        self.total: int | None = None
+        self.last_sync: datetime | None = None
+        self.default_threshold = DEFAULT_LOW_STOCK_THRESHOLD
+        self.thresholds: dict[str, int] = {}
+        self.low: set[str] = set()
+        self.crossings: list[dict[str, Any]] = []
+
+    def __len__(self) -> int:
+        """Return the number of SKUs indexed."""
+        return len(self.skus)
+
+    def quantity(self, sku: str) -> int | None:
+        """Return the available quantity of a SKU, None if it is unknown."""
+        if (row := self._rows.get(sku)) is None:
+            return None
+        return self.quantities[row]
+
+    def threshold(self, sku: str) -> int:
+        """Return the quantity at or below which a SKU is low on stock."""
+        return self.thresholds.get(sku, self.default_threshold)
+
+    def set_thresholds(self, default: int, thresholds: dict[str, int]) -> None:
+        """Apply new thresholds and re-evaluate every SKU without events."""
+        self.default_threshold = default
+        self.thresholds = thresholds
+        self.low = {
+            sku
+            for sku, quantity in zip(self.skus, self.quantities)
+            if quantity <= self.threshold(sku)
+        }
+
+    def set(self, sku: str, quantity: int) -> None:
+        """Record the quantity of a SKU, tracking threshold crossings."""
+        if (row := self._rows.get(sku)) is None:
+            self._rows[sku] = len(self.skus)
+            self.skus.append(sku)
+            self.quantities.append(quantity)
+            self._seen.append(self.passes)
+            # New SKUs only set their state, so a restart fires no events
+            if quantity <= self.threshold(sku):
+                self.low.add(sku)
+            return
+        self._seen[row] = self.passes
+        previous = self.quantities[row]
+        if previous == quantity:
+            return
+        self.quantities[row] = quantity
+        threshold = self.threshold(sku)
+        if (quantity <= threshold) != (previous <= threshold):
+            low = quantity <= threshold
+            if low:
+                self.low.add(sku)
+            else:
+                self.low.discard(sku)
+            self.crossings.append(
+                {"sku": sku, "quantity": quantity, "threshold": threshold, "low": low}
+            )
+
+    def remove(self, skus: Iterable[str]) -> None:
+        """Drop SKUs and compact the columns."""
+        gone = {sku for sku in skus if sku in self._rows}
+        if not gone:
+            return
+        keep = [row for row, sku in enumerate(self.skus) if sku not in gone]
+        self.skus = [self.skus[row] for row in keep]
+        self.quantities = array("q", (self.quantities[row] for row in keep))
+        self._seen = array("L", (self._seen[row] for row in keep))
+        self._rows = {sku: row for row, sku in enumerate(self.skus)}
+        self.low -= gone
+
+    def pop_crossings(self) -> list[dict[str, Any]]:
+        """Return and forget the threshold crossings since the last call."""
+        crossings, self.crossings = self.crossings, []
+        return crossings
+
+    def lowest(self, count: int = LOW_STOCK_LISTED) -> list[str]:
+        """Return the low SKUs with the smallest quantities."""
+        return heapq.nsmallest(count, self.low, key=self.quantity)
+
+    async def async_sync(
+        self, client: EbayApiClient, access_token: str, timeout: float
+    ) -> None:
+        """Advance the rolling walk and re-read the SKUs of new orders."""
+        now = dt.utcnow()
+        if self.last_sync is not None:
+            since = int((self.last_sync - ORDER_SYNC_OVERLAP).timestamp())
+            sold = {
+                item.sku
+                for order in client.order_sync.orders.values()
+                if order.created is not None and order.created >= since
+                for item in order.line_items
+                if item.sku
+            }
+            await self._async_refresh_skus(client, sold, access_token, timeout)
+        # Until the catalog has been indexed once the walk doesn't stop
+        pages = INVENTORY_PAGES_PER_REFRESH if self.passes else None
+        await self._async_walk(client, pages, access_token, timeout)
+        self.last_sync = now
+
+    async def _async_walk(
+        self,
+        client: EbayApiClient,
+        pages: int | None,
+        access_token: str,
+        timeout: float,
+    ) -> None:
+        """Read pages of the catalog from the walk's offset onwards."""
+        limit = INVENTORY_PAGE_LIMIT
+        async with aclosing(
+            client.async_iter_pages(
+                INVENTORY_URL,
+                access_token,
+                limit=limit,
+                window=INVENTORY_PAGE_WINDOW,
+                timeout=timeout,
+                offset=self.offset,
+                pages=pages,
+            )
+        ) as walk:
+            async for page in walk:
+                self.total = int(page.get("total", 0))
+                for item in page.get("inventoryItems", []):
+                    self.set(item["sku"], _quantity(item))
+                # A failed page resumes the walk from there on the next sync
+                self.offset += limit
+        if self.offset >= self.total:
+            self._end_pass()
+
+    def _end_pass(self) -> None:
+        """Wrap the walk around, dropping SKUs it missed twice in a row."""
+        # Offsets shift when items are added or deleted mid-walk, so a single
+        # miss isn't proof a SKU is gone
+        gone = [
+            sku for sku, seen in zip(self.skus, self._seen) if seen + 1 < self.passes
+        ]
+        self.remove(gone)
+        _LOGGER.debug(
+            "eBay inventory pass %s indexed %s SKUs, dropped %s",
+            self.passes,
+            len(self.skus),
+            len(gone),
+        )
+        self.passes += 1
+        self.offset = 0
+
+    async def _async_refresh_skus(
+        self,
+        client: EbayApiClient,
+        skus: set[str],
+        access_token: str,
+        timeout: float,
+    ) -> None:
+        """Re-read the quantities of some SKUs, a bulk request at a time."""
+        ordered = sorted(skus)
+        batches = [
+            ordered[start : start + INVENTORY_BULK_LIMIT]
+            for start in range(0, len(ordered), INVENTORY_BULK_LIMIT)
+        ]
+        responses = await asyncio.gather(
+            *(
+                client.async_request(
+                    METH_POST,
+                    BULK_GET_INVENTORY_URL,
+                    access_token,
+                    timeout,
+                    payload={"requests": [{"sku": sku} for sku in batch]},
+                )
+                for batch in batches
+            )
+        )
+        deleted = []
+        for response in responses:
+            for result in (response.data or {}).get("responses", []):
+                if result.get("statusCode") == 200 and "inventoryItem" in result:
+                    self.set(result["sku"], _quantity(result["inventoryItem"]))
+                elif result.get("statusCode") == 404:
+                    deleted.append(result.get("sku"))
+        self.remove(deleted)
+        if skus:
+            _LOGGER.debug("Re-read %s eBay SKUs of new orders", len(skus))
+
+
+def inventory_values(index: EbayInventoryIndex) -> dict[str, Any]:
+    """Return the low stock sensor values of the index."""
+    low = index.low
+    watched: dict[str, dict[str, Any]] = {}
+    for sku, threshold in index.thresholds.items():
+        quantity = index.quantity(sku)
+        watched[sku] = {
+            "quantity": quantity,
+            "threshold": threshold,
+            "low": quantity is not None and quantity <= threshold,
+        }
+    return {
+        "ebay_low_stock": bool(low),
+        "ebay_low_stock_attributes": {
+            "skus": len(index),
+            "low_stock_skus": len(low),
+            "out_of_stock_skus": sum(index.quantity(sku) <= 0 for sku in low),
+            "lowest": [
+                {
+                    "sku": sku,
+                    "quantity": index.quantity(sku),
+                    "threshold": index.threshold(sku),
+                }
+                for sku in index.lowest()
+            ],
+        },
+        "ebay_watched_skus": watched,
+    }
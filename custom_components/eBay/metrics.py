@@ -0,0 +1,142 @@
+"""Per-endpoint refresh metrics for the ebay integration."""
+from __future__ import annotations
+
+from collections import deque
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+import logging
+from typing import Any
+
+from .const import METRICS_WINDOW
+
+_LOGGER = logging.getLogger(__name__)
+
+# Name of the endpoint whose fetch issued the current request
+current_endpoint: ContextVar[str | None] = ContextVar(
+    "ebay_current_endpoint", default=None
+)
+
+
+def _percentile(values: list[float], q: float) -> float | None:
+    """Return the nearest-rank percentile of sorted values."""
+    if not values:
+        return None
+    return values[min(len(values) - 1, int(q / 100 * len(values)))]
+
+
+@dataclass(slots=True)
+class EndpointMetrics:
+    """Counters and a sliding window of refresh times of one endpoint."""
+
+    durations: deque[float] = field(
+        default_factory=lambda: deque(maxlen=METRICS_WINDOW)
+    )
+    refreshes: int = 0
+    errors: int = 0
+    cache_hits: int = 0
+    not_modified: int = 0
+    requests: int = 0
+    retries: int = 0
+    bytes: int = 0
+    last_status: int | None = None
+    last_size: int | None = None
+
+    def percentiles(self) -> tuple[float | None, float | None]:
+        """Return the p50 and p95 refresh times in seconds."""
+        values = sorted(self.durations)
+        return _percentile(values, 50), _percentile(values, 95)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the metrics as state attributes or diagnostics."""
+        p50, p95 = self.percentiles()
+        return {
+            "p50_ms": round(p50 * 1000) if p50 is not None else None,
+            "p95_ms": round(p95 * 1000) if p95 is not None else None,
+            "last_ms": round(self.durations[-1] * 1000) if self.durations else None,
+            "refreshes": self.refreshes,
+            "errors": self.errors,
+            "cache_hits": self.cache_hits,
+            "not_modified": self.not_modified,
+            "requests": self.requests,
+            "retries": self.retries,
+            "bytes": self.bytes,
+            "last_status": self.last_status,
+            "last_size": self.last_size,
+        }
+
+
+class EbayMetrics:
+    """Per-endpoint timing, status, size, retry and cache metrics of a client.
+
+    Endpoint refreshes record their duration and outcome; the HTTP requests
+    they issue are attributed to them through ``current_endpoint``, so paged
+    endpoints count every page. Requests outside an endpoint refresh, like
+    the quota snapshot, are filed under the API they call.
+    """
+
+    def __init__(self) -> None:
+        """Initialize empty metrics."""
+        self.endpoints: dict[str, EndpointMetrics] = {}
+
+    def get(self, name: str) -> EndpointMetrics:
+        """Return the metrics of an endpoint, creating them if needed."""
+        if (metrics := self.endpoints.get(name)) is None:
+            metrics = self.endpoints[name] = EndpointMetrics()
+        return metrics
+
+    def record_refresh(
+        self, name: str, duration: float, *, error: bool = False, cached: bool = False
+    ) -> None:
+        """Record the outcome of one endpoint refresh."""
+        metrics = self.get(name)
+        metrics.refreshes += 1
+        if error:
+            metrics.errors += 1
+        if cached:
+            metrics.cache_hits += 1
+        else:
+            metrics.durations.append(duration)
+
+    def record_request(
+        self, fallback: str, status: int, size: int | None, retries: int
+    ) -> None:
+        """Record an HTTP response of the endpoint being refreshed."""
+        metrics = self.get(current_endpoint.get() or fallback)
+        metrics.requests += 1
+        metrics.retries += retries
+        metrics.last_status = status
+        if status == 304:
+            metrics.not_modified += 1
+        if size is not None:
+            metrics.bytes += size
+            metrics.last_size = size
+
+    @property
+    def cache_hits(self) -> int:
+        """Return the refreshes answered from the cache or with a 304."""
+        return sum(m.cache_hits + m.not_modified for m in self.endpoints.values())
+
+    @property
+    def retries(self) -> int:
+        """Return the requests retried after a 429."""
+        return sum(m.retries for m in self.endpoints.values())
+
+    def slowest_p95(self) -> float | None:
+        """Return the highest p95 refresh time of any endpoint, in ms."""
+        p95s = [
+            p95
+            for metrics in self.endpoints.values()
+            if (p95 := metrics.percentiles()[1]) is not None
+        ]
+        return round(max(p95s) * 1000) if p95s else None
+
+    def as_dict(self) -> dict[str, dict[str, Any]]:
+        """Return the metrics of every endpoint."""
+        return {name: metrics.as_dict() for name, metrics in self.endpoints.items()}
+
+    def log(self, names: list[str]) -> None:
+        """Log the metrics of the refreshed endpoints at debug level."""
+        if not _LOGGER.isEnabledFor(logging.DEBUG):
+            return
+        for name in names:
+            _LOGGER.debug("eBay %s %s", name, self.get(name).as_dict())
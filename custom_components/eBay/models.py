@@ -0,0 +1,76 @@
+"""Compact order models for the ebay integration."""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any
+
+import homeassistant.util.dt as dt
+
+
+def _timestamp(value: str | None) -> int | None:
+    """Convert an eBay ISO 8601 timestamp to epoch seconds."""
+    if value and (parsed := dt.parse_datetime(value)) is not None:
+        return int(parsed.timestamp())
+    return None
+
+
+@dataclass(slots=True)
+class EbayLineItem:
+    """The fields of a Fulfillment API line item the integration uses."""
+
+    line_item_id: str
+    sku: str | None
+    quantity: int
+    ship_by: int | None
+
+    @classmethod
+    def from_api(cls, data: dict[str, Any]) -> EbayLineItem:
+        """Build a line item from its Fulfillment API payload."""
+        instructions = data.get("lineItemFulfillmentInstructions", {})
+        return cls(
+            line_item_id=data["lineItemId"],
+            sku=data.get("sku"),
+            quantity=int(data.get("quantity", 1)),
+            ship_by=_timestamp(instructions.get("shipByDate")),
+        )
+
+
+@dataclass(slots=True)
+class EbayOrder:
+    """The fields of a Fulfillment API order the integration uses.
+
+    Orders are parsed straight from the decoded page and the raw payload is
+    dropped, so thousands of pending orders cost a few hundred bytes each.
+    """
+
+    order_id: str
+    payment_status: str | None
+    fulfillment_status: str | None
+    cancelled: bool
+    total: float
+    currency: str | None
+    created: int | None
+    ship_by: int | None
+    line_items: tuple[EbayLineItem, ...]
+
+    @classmethod
+    def from_api(cls, data: dict[str, Any]) -> EbayOrder:
+        """Build an order from its Fulfillment API payload."""
+        line_items = tuple(
+            EbayLineItem.from_api(line_item) for line_item in data.get("lineItems", [])
+        )
+        total = data.get("pricingSummary", {}).get("total", {})
+        return cls(
+            order_id=data["orderId"],
+            payment_status=data.get("orderPaymentStatus"),
+            fulfillment_status=data.get("orderFulfillmentStatus"),
+            cancelled=data.get("cancelStatus", {}).get("cancelState") == "CANCELED",
+            total=float(total.get("value", 0)),
+            currency=total.get("currency"),
+            created=_timestamp(data.get("creationDate")),
+            ship_by=min(
+                (item.ship_by for item in line_items if item.ship_by is not None),
+                default=None,
+            ),
+            line_items=line_items,
+        )
@@ -0,0 +1,267 @@
+"""Incremental Fulfillment API order state for the ebay integration."""
+from __future__ import annotations
+
+import asyncio
+from bisect import bisect_left, insort
+from contextlib import aclosing
+from datetime import date, datetime, timedelta
+import logging
+from typing import TYPE_CHECKING, Protocol, cast
+
+import homeassistant.util.dt as dt
+
+from .const import (
+    MODIFIED_ORDERS_URL,
+    ORDER_FULL_SYNC_INTERVAL,
+    ORDER_SYNC_OVERLAP,
+    UNFULFILLED_ORDERS_URL,
+    UNFULFILLED_STATUSES,
+)
+from .models import EbayOrder
+
+if TYPE_CHECKING:
+    from .api import EbayApiClient
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def _format_ebay_datetime(value: datetime) -> str:
+    """Format a datetime the way Fulfillment API date filters expect."""
+    value = dt.as_utc(value)
+    return value.strftime("%Y-%m-%dT%H:%M:%S.") + f"{value.microsecond // 1000:03d}Z"
+
+
+class ShipByIndex:
+    """Pending orders indexed by ship-by time and by local ship-by date.
+
+    Per-date buckets answer "due on day X" in O(1); a list sorted by ship-by
+    time answers overdue and due-within-a-window questions by bisection.
+    eBay does not return the seller's ``sourceTimeZone`` yet, so ship-by
+    dates are bucketed in the Home Assistant time zone.
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty index."""
+        self._ship_by: dict[str, int] = {}
+        self._by_date: dict[date, set[str]] = {}
+        self._sorted: list[tuple[int, str]] = []
+
+    def __len__(self) -> int:
+        """Return the number of indexed orders."""
+        return len(self._ship_by)
+
+    def clear(self) -> None:
+        """Remove every order."""
+        self._ship_by.clear()
+        self._by_date.clear()
+        self._sorted.clear()
+
+    def add(self, order_id: str, ship_by: int | None) -> None:
+        """Index an order, replacing any previous entry."""
+        self.remove(order_id)
+        if ship_by is None:
+            return
+        self._ship_by[order_id] = ship_by
+        self._by_date.setdefault(_local_date(ship_by), set()).add(order_id)
+        insort(self._sorted, (ship_by, order_id))
+
+    def remove(self, order_id: str) -> None:
+        """Drop an order from the index if present."""
+        if (ship_by := self._ship_by.pop(order_id, None)) is None:
+            return
+        day = _local_date(ship_by)
+        bucket = self._by_date[day]
+        bucket.discard(order_id)
+        if not bucket:
+            del self._by_date[day]
+        del self._sorted[bisect_left(self._sorted, (ship_by, order_id))]
+
+    def due_on(self, day: date) -> int:
+        """Return how many orders must ship on a local date."""
+        return len(self._by_date.get(day, ()))
+
+    def overdue(self, now: datetime) -> int:
+        """Return how many orders are past their ship-by time."""
+        return bisect_left(self._sorted, (int(now.timestamp()),))
+
+    def due_within(self, now: datetime, window: timedelta) -> int:
+        """Return how many orders must ship between now and now + window."""
+        start = int(now.timestamp())
+        end = int((now + window).timestamp())
+        return bisect_left(self._sorted, (end,)) - bisect_left(self._sorted, (start,))
+
+    def most_urgent(self, count: int) -> list[tuple[int, str]]:
+        """Return the ``count`` earliest ship-by times with their order ids."""
+        return self._sorted[:count]
+
+
+def _local_date(timestamp: int) -> date:
+    """Return the local date of an epoch timestamp."""
+    return dt.as_local(dt.utc_from_timestamp(timestamp)).date()
+
+
+class EbayOrderSync:
+    """Unfulfilled orders keyed by order id, kept current with delta queries.
+
+    The first sync, and every ``full_sync_interval`` or after a failed sync,
+    downloads the whole unfulfilled set. In between the orders whose
+    ``lastmodifieddate`` is newer than the previous successful sync are
+    merged in by the client's shared ``EbayOrderDeltas`` query.
+    """
+
+    def __init__(
+        self, full_sync_interval: timedelta = ORDER_FULL_SYNC_INTERVAL
+    ) -> None:
+        """Initialize an empty order state."""
+        self.orders: dict[str, EbayOrder] = {}
+        self.ship_by = ShipByIndex()
+        self.full_sync_interval = full_sync_interval
+        self.last_sync: datetime | None = None
+        self.last_full_sync: datetime | None = None
+
+    def needs_full_sync(self, now: datetime) -> bool:
+        """Return True if the next sync has to re-download every order."""
+        return (
+            self.last_sync is None
+            or self.last_full_sync is None
+            or now - self.last_full_sync >= self.full_sync_interval
+        )
+
+    def merge(self, order: EbayOrder) -> None:
+        """Insert, update or drop one order according to its status."""
+        order_id = order.order_id
+        if order.fulfillment_status in UNFULFILLED_STATUSES:
+            self.orders[order_id] = order
+            self.ship_by.add(order_id, order.ship_by)
+        else:
+            self.orders.pop(order_id, None)
+            self.ship_by.remove(order_id)
+
+    def mark_synced(self, now: datetime) -> None:
+        """Record a successful sync at ``now``."""
+        self.last_sync = now
+
+    async def async_sync(
+        self, client: EbayApiClient, access_token: str, timeout: float
+    ) -> None:
+        """Bring the order state up to date, fully or incrementally."""
+        now = dt.utcnow()
+        if not self.needs_full_sync(now):
+            await client.order_deltas.async_sync(client, access_token, timeout)
+            return
+        try:
+            await self._async_full_sync(client, access_token, timeout)
+        except Exception:
+            # Whatever was merged before the failure may be incomplete
+            self.last_sync = None
+            raise
+        self.last_full_sync = now
+        self.mark_synced(now)
+
+    async def _async_full_sync(
+        self, client: EbayApiClient, access_token: str, timeout: float
+    ) -> None:
+        """Replace the order state with the full unfulfilled set."""
+        orders: dict[str, EbayOrder] = {}
+        async with aclosing(
+            client.async_iter_orders(
+                UNFULFILLED_ORDERS_URL, access_token, timeout=timeout
+            )
+        ) as api_orders:
+            async for data in api_orders:
+                order = EbayOrder.from_api(data)
+                orders[order.order_id] = order
+        self.orders = orders
+        self.ship_by.clear()
+        for order_id, order in orders.items():
+            self.ship_by.add(order_id, order.ship_by)
+        _LOGGER.debug("Full eBay order sync loaded %s orders", len(orders))
+
+
+class OrderConsumer(Protocol):
+    """State built from Fulfillment API orders and kept current with deltas."""
+
+    last_sync: datetime | None
+
+    def needs_full_sync(self, now: datetime) -> bool:
+        """Return True if the next sync has to re-download every order."""
+
+    def merge(self, order: EbayOrder) -> None:
+        """Apply one new or changed order."""
+
+    def mark_synced(self, now: datetime) -> None:
+        """Record a successful sync at ``now``."""
+
+
+class EbayOrderDeltas:
+    """One ``lastmodifieddate`` query shared by every order consumer.
+
+    The order sync and the sales ledger both follow modified orders. The
+    first of them to ask starts the query and the other joins it while it
+    runs, so a refresh sends it once and merges every order into both.
+    Consumers due a full sync are left out and run their own.
+    """
+
+    def __init__(self, *consumers: OrderConsumer) -> None:
+        """Initialize the delta query of ``consumers``."""
+        self.consumers = consumers
+        self._task: asyncio.Task[None] | None = None
+
+    async def async_sync(
+        self, client: EbayApiClient, access_token: str, timeout: float
+    ) -> None:
+        """Merge the orders modified since the consumers' last sync."""
+        if self._task is None:
+            self._task = asyncio.create_task(
+                self._async_sync(client, access_token, timeout)
+            )
+            self._task.add_done_callback(self._sync_done)
+        await asyncio.shield(self._task)
+
+    def _sync_done(self, task: asyncio.Task[None]) -> None:
+        """Let the next refresh start a new query."""
+        self._task = None
+        if not task.cancelled():
+            # Retrieved here too, in case every caller was cancelled
+            task.exception()
+
+    async def _async_sync(
+        self, client: EbayApiClient, access_token: str, timeout: float
+    ) -> None:
+        """Query the modified orders once and merge them into every consumer."""
+        now = dt.utcnow()
+        consumers = [
+            consumer
+            for consumer in self.consumers
+            if consumer.last_sync is not None and not consumer.needs_full_sync(now)
+        ]
+        if not consumers:
+            return
+        last_sync = min(cast(datetime, consumer.last_sync) for consumer in consumers)
+        since = _format_ebay_datetime(last_sync - ORDER_SYNC_OVERLAP)
+        changed = 0
+        try:
+            async with aclosing(
+                client.async_iter_orders(
+                    MODIFIED_ORDERS_URL.format(since=since),
+                    access_token,
+                    timeout=timeout,
+                )
+            ) as api_orders:
+                async for data in api_orders:
+                    order = EbayOrder.from_api(data)
+                    for consumer in consumers:
+                        consumer.merge(order)
+                    changed += 1
+        except BaseException:
+            # Whatever was merged before the failure may be incomplete
+            for consumer in consumers:
+                consumer.last_sync = None
+            raise
+        for consumer in consumers:
+            consumer.mark_synced(now)
+        _LOGGER.debug(
+            "Incremental eBay order sync merged %s orders into %s consumers",
+            changed,
+            len(consumers),
+        )
@@ -0,0 +1,181 @@
+"""Rolling sales aggregates of recent eBay orders for the ebay integration."""
+from __future__ import annotations
+
+from contextlib import aclosing
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+import logging
+from typing import TYPE_CHECKING, Any
+
+import homeassistant.util.dt as dt
+
+from .const import CREATED_ORDERS_URL, SALES_FULL_SYNC_INTERVAL, SALES_WINDOWS
+from .models import EbayOrder
+from .orders import _format_ebay_datetime, _local_date
+
+if TYPE_CHECKING:
+    from .api import EbayApiClient
+
+_LOGGER = logging.getLogger(__name__)
+
+
+@dataclass(slots=True)
+class SalesTotals:
+    """Revenue, units and order count of a set of orders in one currency."""
+
+    revenue: float = 0.0
+    units: int = 0
+    orders: int = 0
+
+    def add(self, revenue: float, units: int, orders: int = 1) -> None:
+        """Add orders to the totals; negative values remove them."""
+        self.revenue += revenue
+        self.units += units
+        self.orders += orders
+
+    @property
+    def average_order_value(self) -> float | None:
+        """Return the mean order total, if there are orders."""
+        return round(self.revenue / self.orders, 2) if self.orders else None
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the totals as state attributes."""
+        return {
+            "revenue": round(self.revenue, 2),
+            "units": self.units,
+            "orders": self.orders,
+            "average_order_value": self.average_order_value,
+        }
+
+
+class EbaySalesLedger:
+    """Per-day, per-currency running totals of the orders of the last days.
+
+    Each order's contribution is remembered, so a changed or cancelled order
+    is subtracted from its day before the new version is added, and whole
+    days are dropped once they leave the longest window. Rolling windows then
+    only add up at most ``max(SALES_WINDOWS)`` daily buckets per currency.
+
+    The ledger is filled by re-downloading the orders created within the
+    longest window every ``full_sync_interval``. In between the orders
+    modified since the previous sync are merged in by the client's shared
+    ``EbayOrderDeltas`` query, the same one the order sync reads.
+    """
+
+    def __init__(
+        self, full_sync_interval: timedelta = SALES_FULL_SYNC_INTERVAL
+    ) -> None:
+        """Initialize an empty ledger."""
+        self.full_sync_interval = full_sync_interval
+        self.last_sync: datetime | None = None
+        self.last_full_sync: datetime | None = None
+        self._sales: dict[str, tuple[date, str, float, int]] = {}
+        self._days: dict[date, dict[str, SalesTotals]] = {}
+        self._day_orders: dict[date, set[str]] = {}
+
+    def __len__(self) -> int:
+        """Return the number of orders counted."""
+        return len(self._sales)
+
+    @staticmethod
+    def window_start(today: date) -> date:
+        """Return the first day of the longest window ending today."""
+        return today - timedelta(days=max(SALES_WINDOWS) - 1)
+
+    def needs_full_sync(self, now: datetime) -> bool:
+        """Return True if the next sync has to re-download the window."""
+        return (
+            self.last_sync is None
+            or self.last_full_sync is None
+            or now - self.last_full_sync >= self.full_sync_interval
+        )
+
+    def clear(self) -> None:
+        """Forget every order."""
+        self._sales.clear()
+        self._days.clear()
+        self._day_orders.clear()
+
+    def merge(self, order: EbayOrder, today: date | None = None) -> None:
+        """Count an order, replacing its previous version if any."""
+        self._discard(order.order_id)
+        if order.cancelled or order.created is None or order.currency is None:
+            return
+        day = _local_date(order.created)
+        if day < self.window_start(today or dt.now().date()):
+            return
+        units = sum(item.quantity for item in order.line_items)
+        self._sales[order.order_id] = (day, order.currency, order.total, units)
+        self._day_orders.setdefault(day, set()).add(order.order_id)
+        totals = self._days.setdefault(day, {})
+        totals.setdefault(order.currency, SalesTotals()).add(order.total, units)
+
+    def _discard(self, order_id: str) -> None:
+        """Subtract a counted order from its day."""
+        if (sale := self._sales.pop(order_id, None)) is None:
+            return
+        day, currency, revenue, units = sale
+        self._day_orders[day].discard(order_id)
+        totals = self._days[day]
+        totals[currency].add(-revenue, -units, -1)
+        # Drop empty buckets so float rounding never leaves a stray remainder
+        if not totals[currency].orders:
+            del totals[currency]
+        if not totals:
+            del self._days[day]
+            del self._day_orders[day]
+
+    def prune(self, today: date) -> None:
+        """Drop the days that left the longest window."""
+        start = self.window_start(today)
+        for day in [day for day in self._days if day < start]:
+            for order_id in self._day_orders.pop(day):
+                del self._sales[order_id]
+            del self._days[day]
+
+    def totals(self, days: int, today: date) -> dict[str, SalesTotals]:
+        """Return the per-currency totals of the ``days`` days ending today."""
+        result: dict[str, SalesTotals] = {}
+        for offset in range(days):
+            for currency, totals in self._days.get(
+                today - timedelta(days=offset), {}
+            ).items():
+                result.setdefault(currency, SalesTotals()).add(
+                    totals.revenue, totals.units, totals.orders
+                )
+        return result
+
+    def mark_synced(self, now: datetime) -> None:
+        """Record a successful sync at ``now`` and drop days out of the window."""
+        self.prune(dt.now().date())
+        self.last_sync = now
+
+    async def async_sync(
+        self, client: EbayApiClient, access_token: str, timeout: float
+    ) -> None:
+        """Bring the ledger up to date, fully or incrementally."""
+        now = dt.utcnow()
+        if not self.needs_full_sync(now):
+            await client.order_deltas.async_sync(client, access_token, timeout)
+            return
+        try:
+            await self._async_full_sync(client, access_token, timeout, dt.now().date())
+        except Exception:
+            self.last_sync = None
+            raise
+        self.last_full_sync = now
+        self.mark_synced(now)
+
+    async def _async_full_sync(
+        self, client: EbayApiClient, access_token: str, timeout: float, today: date
+    ) -> None:
+        """Recount every order created within the longest window."""
+        start = dt.start_of_local_day(self.window_start(today))
+        url = CREATED_ORDERS_URL.format(since=_format_ebay_datetime(start))
+        self.clear()
+        async with aclosing(
+            client.async_iter_orders(url, access_token, timeout=timeout)
+        ) as api_orders:
+            async for data in api_orders:
+                self.merge(EbayOrder.from_api(data), today)
+        _LOGGER.debug("Full eBay sales sync counted %s orders", len(self._sales))
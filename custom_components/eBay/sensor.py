@@ -1,55 +1,149 @@
-from datetime import timedelta
+from __future__ import annotations
+
+from collections.abc import Callable
+from dataclasses import dataclass
 import logging
+from typing import Any
 
 from homeassistant.components.sensor import (
+    RestoreSensor,
+    SensorDeviceClass,
     SensorEntity,
     SensorEntityDescription,
+    SensorExtraStoredData,
+    SensorStateClass,
 )
+from homeassistant.const import EntityCategory, UnitOfTime
 
 
-from homeassistant.helpers.update_coordinator import (
-    CoordinatorEntity,
-    DataUpdateCoordinator,
-    UpdateFailed,
+from .const import (
+    DOMAIN,
+    EBAY_QUERIES_SENSOR,
+    GROUP_ORDERS,
+    EbaySensorEntityDescription,
 )
-from .const import DOMAIN, EBAY_QUERIES_SENSOR
-from .api import get_ebay_data
+from .api import ENDPOINTS, EbayApiClient
+from .entity import EbayEntity
 
 _LOGGER = logging.getLogger(__name__)
 
 
+@dataclass(frozen=True, kw_only=True)
+class EbayDiagnosticSensorEntityDescription(SensorEntityDescription):
+    """Describes a sensor reporting the request governor or refresh metrics."""
+
+    value_fn: Callable[[EbayApiClient], Any]
+    attributes_fn: Callable[[EbayApiClient], dict[str, Any]] | None = None
+
+
+def _calls_remaining(client: EbayApiClient) -> int | None:
+    """Return the calls left on the tightest known quota."""
+    governor = client.governor
+    remaining = [
+        value
+        for api in governor.quotas
+        if (value := governor.remaining(api)) is not None
+    ]
+    return min(remaining) if remaining else None
+
+
+def _quota_attributes(client: EbayApiClient) -> dict[str, Any]:
+    """Return the quota of every API eBay reported."""
+    governor = client.governor
+    return {
+        api: {
+            "limit": quota.limit,
+            "remaining": governor.remaining(api),
+            "reset": quota.reset.isoformat() if quota.reset else None,
+        }
+        for api, quota in governor.quotas.items()
+    }
+
+
+EBAY_DIAGNOSTIC_SENSOR: tuple[EbayDiagnosticSensorEntityDescription, ...] = (
+    EbayDiagnosticSensorEntityDescription(
+        key="ebay_api_calls_remaining",
+        name="API Calls Remaining",
+        icon="mdi:counter",
+        value_fn=_calls_remaining,
+        attributes_fn=_quota_attributes,
+    ),
+    EbayDiagnosticSensorEntityDescription(
+        key="ebay_api_calls",
+        name="API Calls",
+        icon="mdi:api",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda client: sum(client.governor.calls.values()),
+        attributes_fn=lambda client: dict(client.governor.calls),
+    ),
+    EbayDiagnosticSensorEntityDescription(
+        key="ebay_rate_limited_responses",
+        name="Rate Limited Responses",
+        icon="mdi:speedometer-slow",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda client: client.governor.rate_limited,
+    ),
+    EbayDiagnosticSensorEntityDescription(
+        key="ebay_deferred_refreshes",
+        name="Deferred Refreshes",
+        icon="mdi:timer-sand",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda client: client.governor.deferred,
+    ),
+    EbayDiagnosticSensorEntityDescription(
+        key="ebay_refresh_time_p95",
+        name="Refresh Time P95",
+        icon="mdi:timer-outline",
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda client: client.metrics.slowest_p95(),
+        attributes_fn=lambda client: client.metrics.as_dict(),
+    ),
+    EbayDiagnosticSensorEntityDescription(
+        key="ebay_cache_hits",
+        name="Cache Hits",
+        icon="mdi:cached",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda client: client.metrics.cache_hits,
+    ),
+    EbayDiagnosticSensorEntityDescription(
+        key="ebay_request_retries",
+        name="Request Retries",
+        icon="mdi:reload",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda client: client.metrics.retries,
+    ),
+)
+
+
 async def async_setup_entry(hass, entry, async_add_entities):
     # assuming API object stored here by __init__.py
     api = hass.data[DOMAIN][entry.entry_id]
 
-    async def async_update_data():
-        try:
-            await api.session.async_ensure_token_valid(),
-            access_token = api.session.token["access_token"]
-            return await get_ebay_data(access_token)
-        except Exception as ex:
-            raise UpdateFailed(f"Error getting Ebay data: {ex}") from ex
-
-    coordinator = DataUpdateCoordinator(
-        hass,
-        _LOGGER,
-        # Name of the data. For logging purposes.
-        name="ebay",
-        update_method=async_update_data,
-        # Polling interval. Will only be polled if there are subscribers.
-        update_interval=timedelta(minutes=5),
-    )
-    await coordinator.async_config_entry_first_refresh()
+    # Each sensor follows the coordinator of the endpoint group producing it;
+    # sensors of endpoints turned off in the options are not created
+    key_groups = {
+        key: endpoint.group for endpoint in ENDPOINTS for key in endpoint.keys
+    }
 
     ebay_entity_list = []
 
     ebay_entity_list.extend(
         [
-            ebayOrders(
-                coordinator,
-                description,
-            )
+            ebayOrders(coordinator, description, entry)
             for description in EBAY_QUERIES_SENSOR
+            if (coordinator := api.coordinators[key_groups[description.key]]).provides(
+                description.key
+            )
+        ]
+    )
+
+    # Request state changes with every refresh; the orders group runs most often
+    ebay_entity_list.extend(
+        [
+            ebayDiagnostic(api.coordinators[GROUP_ORDERS], description, entry)
+            for description in EBAY_DIAGNOSTIC_SENSOR
         ]
     )
 
@@ -57,16 +151,71 @@ async def async_setup_entry(hass, entry, async_add_entities):
         async_add_entities(ebay_entity_list)
 
 
-class ebayOrders(CoordinatorEntity, SensorEntity):
-    """An entity using CoordinatorEntity."""
+class ebayOrders(EbayEntity, RestoreSensor):
+    """An eBay sensor reading its value from its group coordinator.
+
+    Until the group's first refresh the sensor shows its value from before
+    the restart.
+    """
+
+    entity_description: EbaySensorEntityDescription
+    _restored: SensorExtraStoredData | None = None
+
+    async def async_added_to_hass(self) -> None:
+        """Restore the last value while the group has no data yet."""
+        await super().async_added_to_hass()
+        if self.coordinator.data is None:
+            self._restored = await self.async_get_last_sensor_data()
+
+    @property
+    def native_value(self):
+        """Value of sensor."""
+        if self.coordinator.data is None:
+            return self._restored.native_value if self._restored else None
+        return self.coordinator.data.get(self.entity_description.key)
+
+    @property
+    def available(self) -> bool:
+        """Unavailable once the endpoint's last good value is stale."""
+        if self.coordinator.data is None:
+            return self._restored is not None
+        return super().available and self.coordinator.is_fresh(
+            self.entity_description.key
+        )
+
+    @property
+    def native_unit_of_measurement(self) -> str | None:
+        """Unit of the sensor, the sales currency for monetary sensors."""
+        if (key := self.entity_description.unit_key) is None:
+            return super().native_unit_of_measurement
+        if self.coordinator.data is None:
+            return self._restored.native_unit_of_measurement if self._restored else None
+        return self.coordinator.data.get(key)
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any] | None:
+        """Extra attributes the endpoint reported for this sensor."""
+        if (key := self.entity_description.attributes_key) is None:
+            return None
+        return (self.coordinator.data or {}).get(key)
 
-    def __init__(self, coordinator, description: SensorEntityDescription):
-        """Pass coordinator to CoordinatorEntity."""
-        super().__init__(coordinator)
-        self.entity_description = description
-        self._attr_unique_id = f"{description.key}"
+
+class ebayDiagnostic(EbayEntity, SensorEntity):
+    """A diagnostic entity reporting the request state of the entry."""
+
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    entity_description: EbayDiagnosticSensorEntityDescription
+    # Reads the client, not the coordinator data, so it needs no endpoint
+    data_key = None
 
     @property
     def native_value(self):
         """Value of sensor."""
-        return self.coordinator.data[self.entity_description.key]
+        return self.entity_description.value_fn(self.coordinator.api.client)
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any] | None:
+        """Details behind the value."""
+        if self.entity_description.attributes_fn is None:
+            return None
+        return self.entity_description.attributes_fn(self.coordinator.api.client)
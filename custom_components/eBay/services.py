@@ -0,0 +1,178 @@
+"""Services of the ebay integration."""
+from __future__ import annotations
+
+from typing import Any
+
+import voluptuous as vol
+
+from homeassistant.config_entries import ConfigEntryState
+from homeassistant.core import (
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+)
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers import config_validation as cv
+
+from .api import ConfigEntryAuth, granted_scopes
+from .const import (
+    DOMAIN,
+    FULFILLMENT_SCOPE,
+    SERVICE_CREATE_SHIPPING_FULFILLMENT,
+    SERVICE_GET_STOCK,
+    SERVICE_UPLOAD_TRACKING,
+)
+from .fulfillment import ShipmentRequest
+
+ATTR_CONFIG_ENTRY_ID = "config_entry_id"
+ATTR_ORDER_ID = "order_id"
+ATTR_TRACKING_NUMBER = "tracking_number"
+ATTR_CARRIER = "carrier"
+ATTR_LINE_ITEMS = "line_items"
+ATTR_LINE_ITEM_ID = "line_item_id"
+ATTR_QUANTITY = "quantity"
+ATTR_SHIPPED_DATE = "shipped_date"
+ATTR_SHIPMENTS = "shipments"
+ATTR_SKUS = "skus"
+
+LINE_ITEM_SCHEMA = vol.Any(
+    cv.string,
+    vol.Schema(
+        {
+            vol.Required(ATTR_LINE_ITEM_ID): cv.string,
+            vol.Optional(ATTR_QUANTITY): cv.positive_int,
+        }
+    ),
+)
+
+SHIPMENT_SCHEMA = {
+    vol.Required(ATTR_ORDER_ID): cv.string,
+    vol.Required(ATTR_TRACKING_NUMBER): cv.string,
+    vol.Required(ATTR_CARRIER): cv.string,
+    vol.Optional(ATTR_LINE_ITEMS): vol.All(cv.ensure_list, [LINE_ITEM_SCHEMA]),
+    vol.Optional(ATTR_SHIPPED_DATE): cv.datetime,
+}
+
+CREATE_SHIPPING_FULFILLMENT_SCHEMA = vol.Schema(
+    {vol.Optional(ATTR_CONFIG_ENTRY_ID): cv.string, **SHIPMENT_SCHEMA}
+)
+
+UPLOAD_TRACKING_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_CONFIG_ENTRY_ID): cv.string,
+        vol.Required(ATTR_SHIPMENTS): vol.All(
+            cv.ensure_list, vol.Length(min=1), [vol.Schema(SHIPMENT_SCHEMA)]
+        ),
+    }
+)
+
+GET_STOCK_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_CONFIG_ENTRY_ID): cv.string,
+        vol.Required(ATTR_SKUS): vol.All(cv.ensure_list, [cv.string]),
+    }
+)
+
+
+def _shipment(data: dict[str, Any]) -> ShipmentRequest:
+    """Build a shipment from validated service data."""
+    line_items = None
+    if ATTR_LINE_ITEMS in data:
+        line_items = tuple(
+            (item, None)
+            if isinstance(item, str)
+            else (item[ATTR_LINE_ITEM_ID], item.get(ATTR_QUANTITY))
+            for item in data[ATTR_LINE_ITEMS]
+        )
+    return ShipmentRequest(
+        order_id=data[ATTR_ORDER_ID],
+        tracking_number=data[ATTR_TRACKING_NUMBER],
+        carrier=data[ATTR_CARRIER],
+        line_items=line_items,
+        shipped_date=data.get(ATTR_SHIPPED_DATE),
+    )
+
+
+def _account(hass: HomeAssistant, call: ServiceCall) -> ConfigEntryAuth:
+    """Return the account a service call targets.
+
+    The account may be left out while only one is loaded.
+    """
+    entries = [
+        entry
+        for entry in hass.config_entries.async_entries(DOMAIN)
+        if entry.state is ConfigEntryState.LOADED
+    ]
+    if (entry_id := call.data.get(ATTR_CONFIG_ENTRY_ID)) is not None:
+        entries = [entry for entry in entries if entry.entry_id == entry_id]
+        if not entries:
+            raise HomeAssistantError(f"eBay account {entry_id} is not loaded")
+    elif len(entries) != 1:
+        raise HomeAssistantError(
+            "Several eBay accounts are loaded, pass the config_entry_id to use"
+            if entries
+            else "No eBay account is loaded"
+        )
+    return hass.data[DOMAIN][entries[0].entry_id]
+
+
+def _shipping_account(hass: HomeAssistant, call: ServiceCall) -> ConfigEntryAuth:
+    """Return the account a shipping service call targets.
+
+    Accounts authorized before the services existed lack the write scope;
+    for those a reauthentication is started instead.
+    """
+    auth = _account(hass, call)
+    if FULFILLMENT_SCOPE not in granted_scopes(auth.session.token):
+        entry = auth.session.config_entry
+        entry.async_start_reauth(hass)
+        raise HomeAssistantError(
+            f"eBay account {entry.title} has no write access to orders yet;"
+            " re-authenticate it from Settings > Devices & Services to ship orders"
+        )
+    return auth
+
+
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the fulfillment and inventory services."""
+
+    async def async_create_shipping_fulfillment(call: ServiceCall) -> ServiceResponse:
+        queue = _shipping_account(hass, call).fulfillment
+        return {"queued": queue.submit([_shipment(call.data)])}
+
+    async def async_upload_tracking(call: ServiceCall) -> ServiceResponse:
+        queue = _shipping_account(hass, call).fulfillment
+        return {
+            "queued": queue.submit(
+                [_shipment(shipment) for shipment in call.data[ATTR_SHIPMENTS]]
+            )
+        }
+
+    async def async_get_stock(call: ServiceCall) -> ServiceResponse:
+        inventory = _account(hass, call).client.inventory
+        return {
+            "quantities": {sku: inventory.quantity(sku) for sku in call.data[ATTR_SKUS]}
+        }
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_CREATE_SHIPPING_FULFILLMENT,
+        async_create_shipping_fulfillment,
+        schema=CREATE_SHIPPING_FULFILLMENT_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_UPLOAD_TRACKING,
+        async_upload_tracking,
+        schema=UPLOAD_TRACKING_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_GET_STOCK,
+        async_get_stock,
+        schema=GET_STOCK_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
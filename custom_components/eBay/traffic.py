@@ -0,0 +1,145 @@
+"""Per-listing traffic report columns for the ebay integration."""
+from __future__ import annotations
+
+from array import array
+from collections.abc import Iterable, Sequence
+from datetime import date
+import heapq
+import logging
+from typing import Any
+
+import homeassistant.util.dt as dt
+
+from .const import TRAFFIC_TOP_LISTINGS
+
+_LOGGER = logging.getLogger(__name__)
+
+_IMPRESSIONS = "LISTING_IMPRESSION"
+_PAGE_VIEWS = ("LISTING_PAGE_VIEWS", "LISTING_VIEWS")
+
+
+def _metric_positions(data: dict[str, Any]) -> tuple[int, int] | None:
+    """Return the positions of impressions and page views in metricValues.
+
+    The report header lists the metrics in the order of every record's
+    ``metricValues``; older responses name the metric in each value instead.
+    """
+    names = [metric.get("key") for metric in data.get("header", {}).get("metrics", [])]
+    if not names and (records := data.get("records")):
+        names = [value.get("metricName") for value in records[0]["metricValues"]]
+    try:
+        views = next(names.index(name) for name in _PAGE_VIEWS if name in names)
+        return names.index(_IMPRESSIONS), views
+    except (StopIteration, ValueError):
+        return None
+
+
+class ListingTrafficStore:
+    """Impressions and page views per listing, kept as parallel columns.
+
+    Every listing ever reported owns a row: its id in ``listing_ids`` and its
+    counts at the same index of the ``array`` columns, which cost 8 bytes per
+    value instead of a dict per record. The columns of the last report of the
+    previous local day are kept alongside for day-over-day changes.
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty store."""
+        self.listing_ids: list[str] = []
+        self._rows: dict[str, int] = {}
+        self.impressions = array("q")
+        self.page_views = array("q")
+        self.previous_impressions: array[int] | None = None
+        self.previous_page_views: array[int] | None = None
+        self.day: date | None = None
+
+    def __len__(self) -> int:
+        """Return the number of listings tracked."""
+        return len(self.listing_ids)
+
+    def update(self, data: dict[str, Any], today: date | None = None) -> None:
+        """Replace the counts with a LISTING traffic report.
+
+        Listings missing from the report are reset to zero.
+        """
+        today = today or dt.now().date()
+        if self.day is not None and today != self.day:
+            self.previous_impressions = array("q", self.impressions)
+            self.previous_page_views = array("q", self.page_views)
+        self.day = today
+
+        records = data.get("records") or []
+        if (positions := _metric_positions(data)) is None:
+            if records:
+                _LOGGER.warning("eBay traffic report has no impressions or views")
+            records = []
+        impressions_at, views_at = positions or (0, 0)
+        impressions = array("q", bytes(8 * len(self.listing_ids)))
+        page_views = array("q", impressions)
+        rows = self._rows
+        for record in records:
+            listing_id = record["dimensionValues"][0]["value"]
+            if (row := rows.get(listing_id)) is None:
+                row = rows[listing_id] = len(self.listing_ids)
+                self.listing_ids.append(listing_id)
+                impressions.append(0)
+                page_views.append(0)
+            values = record["metricValues"]
+            impressions[row] = int(float(values[impressions_at].get("value", 0)))
+            page_views[row] = int(float(values[views_at].get("value", 0)))
+        self.impressions = impressions
+        self.page_views = page_views
+
+    def click_through_rates(self) -> array[float]:
+        """Return the page views per impression of every listing, in percent."""
+        return array(
+            "d",
+            map(
+                lambda views, shown: views / shown * 100 if shown else 0.0,
+                self.page_views,
+                self.impressions,
+            ),
+        )
+
+    def changes(self, column: str) -> array[int] | None:
+        """Return the per-listing change of a column since the previous day."""
+        current: array[int] = getattr(self, column)
+        previous: array[int] | None = getattr(self, f"previous_{column}")
+        if previous is None:
+            return None
+        # Listings first reported today have no previous row
+        previous = previous + array("q", bytes(8 * (len(current) - len(previous))))
+        return array("q", map(int.__sub__, current, previous))
+
+    def listing(self, row: int, rates: array[float]) -> dict[str, Any]:
+        """Return the metrics of one listing as state attributes."""
+        return {
+            "listing_id": self.listing_ids[row],
+            "impressions": self.impressions[row],
+            "page_views": self.page_views[row],
+            "click_through_rate": round(rates[row], 2),
+        }
+
+    def top(
+        self,
+        column: Sequence[float],
+        count: int = TRAFFIC_TOP_LISTINGS,
+        *,
+        rows: Iterable[int] | None = None,
+    ) -> list[int]:
+        """Return the rows with the highest values of a column."""
+        return heapq.nlargest(
+            count, range(len(column)) if rows is None else rows, key=column.__getitem__
+        )
+
+    def bottom(
+        self,
+        column: Sequence[float],
+        count: int = TRAFFIC_TOP_LISTINGS,
+        *,
+        rows: Iterable[int] | None = None,
+    ) -> list[int]:
+        """Return the rows with the lowest values of a column."""
+        return heapq.nsmallest(
+            count, range(len(column)) if rows is None else rows, key=column.__getitem__
+        )
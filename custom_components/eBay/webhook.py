@@ -0,0 +1,262 @@
+"""eBay Notification API webhook for the ebay integration."""
+from __future__ import annotations
+
+import asyncio
+import base64
+from datetime import datetime
+import hashlib
+import json
+import logging
+import re
+import secrets
+import time
+from typing import Any
+
+from aiohttp import web
+from aiohttp.hdrs import METH_GET, METH_POST
+from cryptography.exceptions import InvalidSignature
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.asymmetric import ec
+from cryptography.hazmat.primitives.serialization import load_pem_public_key
+
+from homeassistant.components import persistent_notification, webhook
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+import homeassistant.util.dt as dt
+
+from .api import ConfigEntryAuth, EbayImplementation, merge_orders
+from .const import (
+    CONF_VERIFICATION_TOKEN,
+    CONF_WEBHOOK_ID,
+    DEFAULT_ENDPOINT_TIMEOUT,
+    DOMAIN,
+    GROUP_ORDERS,
+    NOTIFICATION_PUBLIC_KEY_URL,
+    ORDER_URL,
+    WEBHOOK_HEALTHY_WINDOW,
+    WEBHOOK_KEY_FAILURE_TTL,
+    WEBHOOK_KEY_LOOKUP_PAUSE,
+)
+from .decoder import json_loads
+from .models import EbayOrder
+
+_LOGGER = logging.getLogger(__name__)
+
+_ORDER_ID = re.compile(r"[\w-]+")
+_KEY_ID = re.compile(r"[A-Za-z0-9-]{1,64}")
+
+
+def _pem(key: str) -> bytes:
+    """Restore the line breaks eBay strips from its PEM public keys."""
+    body = re.sub(r"-----(BEGIN|END) PUBLIC KEY-----|\s", "", key)
+    lines = [body[i : i + 64] for i in range(0, len(body), 64)]
+    return "\n".join(
+        ["-----BEGIN PUBLIC KEY-----", *lines, "-----END PUBLIC KEY-----", ""]
+    ).encode()
+
+
+class EbayWebhook:
+    """Receive eBay Notification API events for one account.
+
+    GET requests answer eBay's endpoint challenge. POST requests must carry a
+    valid ``X-EBAY-SIGNATURE``; notifications about an order fetch just that
+    order, merge it into the synced order state and push the new values to
+    the orders coordinator, without a full refresh.
+    """
+
+    def __init__(
+        self, hass: HomeAssistant, entry: ConfigEntry, auth: ConfigEntryAuth
+    ) -> None:
+        """Initialize the webhook of a config entry."""
+        self.hass = hass
+        self.entry = entry
+        self.auth = auth
+        self.webhook_id: str = entry.data[CONF_WEBHOOK_ID]
+        self.url = webhook.async_generate_url(hass, self.webhook_id)
+        self.last_received: datetime | None = None
+        self.received = 0
+        self.rejected = 0
+        self._public_keys: dict[str, Any] = {}
+        # Monotonic time until which each failed key id is not looked up
+        self._failed_keys: dict[str, float] = {}
+        self._lookups_paused_until = 0.0
+        self._lookup_lock = asyncio.Lock()
+
+    def is_healthy(self, now: datetime) -> bool:
+        """Return True if a valid notification arrived recently."""
+        return (
+            self.last_received is not None
+            and now - self.last_received < WEBHOOK_HEALTHY_WINDOW
+        )
+
+    def async_register(self) -> None:
+        """Register the webhook with Home Assistant."""
+        webhook.async_register(
+            self.hass,
+            DOMAIN,
+            f"eBay {self.entry.title}",
+            self.webhook_id,
+            self._async_handle,
+            local_only=False,
+            allowed_methods=(METH_GET, METH_POST),
+        )
+
+    def async_unregister(self) -> None:
+        """Unregister the webhook."""
+        webhook.async_unregister(self.hass, self.webhook_id)
+
+    async def _async_handle(
+        self, hass: HomeAssistant, webhook_id: str, request: web.Request
+    ) -> web.Response:
+        """Answer a challenge or accept a notification."""
+        if request.method == METH_GET:
+            return self._challenge(request)
+
+        body = await request.read()
+        if not await self._async_verify(request.headers.get("X-EBAY-SIGNATURE"), body):
+            self.rejected += 1
+            return web.Response(status=412)
+        try:
+            payload = json_loads(body)
+        except ValueError:
+            payload = None
+        if not isinstance(payload, dict):
+            self.rejected += 1
+            return web.Response(status=400)
+        notification = payload.get("notification")
+        data = notification.get("data") if isinstance(notification, dict) else None
+        order_id = data.get("orderId") if isinstance(data, dict) else None
+        if order_id is not None and not (
+            isinstance(order_id, str) and _ORDER_ID.fullmatch(order_id)
+        ):
+            self.rejected += 1
+            return web.Response(status=400)
+
+        self.received += 1
+        self.last_received = dt.utcnow()
+        if order_id is not None:
+            self.entry.async_create_background_task(
+                hass, self._async_update_order(order_id), f"ebay order {order_id}"
+            )
+        return web.Response(status=204)
+
+    def _challenge(self, request: web.Request) -> web.Response:
+        """Answer the endpoint validation challenge."""
+        if (code := request.query.get("challenge_code")) is None:
+            return web.Response(status=400)
+        digest = hashlib.sha256(
+            (code + self.entry.data[CONF_VERIFICATION_TOKEN] + self.url).encode()
+        ).hexdigest()
+        return web.json_response({"challengeResponse": digest})
+
+    async def _async_verify(self, header: str | None, body: bytes) -> bool:
+        """Check the ECDSA signature eBay attached to a notification."""
+        if not header:
+            return False
+        try:
+            signature = json.loads(base64.b64decode(header))
+            public_key = await self._async_public_key(signature["kid"])
+            public_key.verify(
+                base64.b64decode(signature["signature"]),
+                body,
+                ec.ECDSA(hashes.SHA1()),
+            )
+        except InvalidSignature:
+            _LOGGER.debug("Rejected eBay notification with an invalid signature")
+            return False
+        except Exception as ex:
+            _LOGGER.debug("Unable to verify eBay notification: %r", ex)
+            return False
+        return True
+
+    async def _async_public_key(self, key_id: str) -> Any:
+        """Return the notification public key with the given id.
+
+        The id comes from an unauthenticated request, so only well-formed ids
+        are looked up. A failed lookup is not repeated for
+        ``WEBHOOK_KEY_FAILURE_TTL`` and pauses lookups of any other unknown
+        key for ``WEBHOOK_KEY_LOOKUP_PAUSE``, so forged ids can't spend the
+        keyset's quota.
+        """
+        if not isinstance(key_id, str) or not _KEY_ID.fullmatch(key_id):
+            raise ValueError(f"Malformed public key id {key_id!r}")
+        if (public_key := self._public_keys.get(key_id)) is not None:
+            return public_key
+        async with self._lookup_lock:
+            return await self._async_fetch_public_key(key_id)
+
+    async def _async_fetch_public_key(self, key_id: str) -> Any:
+        """Fetch and remember a public key unless its lookup is held back."""
+        if (public_key := self._public_keys.get(key_id)) is not None:
+            return public_key
+        now = time.monotonic()
+        self._failed_keys = {
+            failed: until for failed, until in self._failed_keys.items() if until > now
+        }
+        if key_id in self._failed_keys or now < self._lookups_paused_until:
+            raise ValueError(f"Public key {key_id} lookup recently failed")
+        implementation = self.auth.session.implementation
+        if not isinstance(implementation, EbayImplementation):
+            raise ValueError("Notification keys need the eBay OAuth implementation")
+        try:
+            data = await self.auth.client.async_get_json(
+                NOTIFICATION_PUBLIC_KEY_URL.format(public_key_id=key_id),
+                await implementation.async_application_token(),
+                DEFAULT_ENDPOINT_TIMEOUT,
+            )
+            public_key = load_pem_public_key(_pem(data["key"]))
+        except Exception:
+            now = time.monotonic()
+            self._failed_keys[key_id] = now + WEBHOOK_KEY_FAILURE_TTL
+            self._lookups_paused_until = now + WEBHOOK_KEY_LOOKUP_PAUSE
+            raise
+        self._public_keys[key_id] = public_key
+        return public_key
+
+    async def _async_update_order(self, order_id: str) -> None:
+        """Fetch one changed order and push the new order and sales values."""
+        client = self.auth.client
+        try:
+            data = await client.async_get_json(
+                ORDER_URL.format(order_id=order_id),
+                await self.auth.token_manager.async_get_access_token(),
+                DEFAULT_ENDPOINT_TIMEOUT,
+            )
+            order = EbayOrder.from_api(data)
+        except Exception as ex:
+            _LOGGER.warning("Error fetching notified eBay order %s: %r", order_id, ex)
+            return
+        coordinator = self.auth.coordinators.get(GROUP_ORDERS)
+        if (values := merge_orders(client, [order])) and coordinator is not None:
+            coordinator.async_push_update(values)
+
+
+async def async_setup_webhook(
+    hass: HomeAssistant, entry: ConfigEntry, auth: ConfigEntryAuth
+) -> EbayWebhook:
+    """Create and register the webhook of an entry, generating its ids once."""
+    if CONF_WEBHOOK_ID not in entry.data:
+        hass.config_entries.async_update_entry(
+            entry,
+            data={
+                **entry.data,
+                CONF_WEBHOOK_ID: webhook.async_generate_id(),
+                CONF_VERIFICATION_TOKEN: secrets.token_hex(32),
+            },
+        )
+        receiver = EbayWebhook(hass, entry, auth)
+        persistent_notification.async_create(
+            hass,
+            (
+                "To receive eBay order notifications, add this endpoint in the"
+                " eBay developer portal under Alerts & Notifications:\n\n"
+                f"Endpoint: `{receiver.url}`\n\n"
+                f"Verification token: `{entry.data[CONF_VERIFICATION_TOKEN]}`"
+            ),
+            title=f"eBay {entry.title} notifications",
+            notification_id=f"{DOMAIN}_{entry.entry_id}_webhook",
+        )
+    else:
+        receiver = EbayWebhook(hass, entry, auth)
+    receiver.async_register()
+    return receiver